@@ -0,0 +1,197 @@
+"""
+In-process cluster state cache fed by Kubernetes watch streams.
+
+Instead of shelling out to `kubectl get pods -A -o json` every orchestrator
+tick (the single most expensive apiserver call), keep pods and nodes in two
+dicts that are mutated on ADDED/MODIFIED/DELETED watch events by background
+daemon threads.  A periodic full re-list self-heals the cache if a watch
+stream drops events.
+
+Requires the `kubernetes` Python client; importing this module fails cleanly
+with ImportError otherwise, so callers can fall back to the kubectl path in
+utils.functions.
+"""
+
+import queue
+import threading
+import time
+
+from kubernetes import client, config, watch
+
+RESYNC_INTERVAL_SECS = 60
+WATCH_TIMEOUT_SECS = 600
+
+
+def _load_config():
+    try:
+        config.load_incluster_config()
+    except config.ConfigException:
+        config.load_kube_config()
+
+
+class ClusterCache:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pods = {}   # uid -> pod dict (subset of fields we need)
+        self._nodes = {}  # name -> node dict
+        self._started = False
+        self._ready = threading.Event()
+        self._subscribers = []
+
+    def subscribe(self):
+        """Returns a Queue that receives a wakeup event on cluster state changes."""
+        q = queue.Queue()
+        with self._lock:
+            self._subscribers.append(q)
+        return q
+
+    def _notify(self, kind):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            # Coalesce: a single pending event is enough to wake a consumer
+            if q.empty():
+                q.put(kind)
+
+    def start(self):
+        """Starts the pod and node watcher threads (idempotent).
+
+        Raises if neither in-cluster nor kubeconfig credentials load, and
+        only marks itself started on success, so a failed attempt can be
+        retried and never leaves a cache that answers with an empty cluster.
+        """
+        with self._lock:
+            if self._started:
+                return
+            _load_config()
+            self._core = client.CoreV1Api()
+            self._started = True
+        threading.Thread(target=self._watch_pods, daemon=True, name="cluster-cache-pods").start()
+        threading.Thread(target=self._watch_nodes, daemon=True, name="cluster-cache-nodes").start()
+        self._ready.wait(timeout=60)
+
+    # ----- watchers -----
+
+    def _pod_record(self, pod):
+        spec = pod.spec
+        status = pod.status
+        containers = spec.containers or []
+        init_containers = spec.init_containers or []
+
+        def gpu_req(c):
+            req = (c.resources.requests or {}) if c.resources else {}
+            return int(req.get('nvidia.com/gpu', 0))
+
+        app_req = sum(gpu_req(c) for c in containers)
+        init_reqs = [gpu_req(c) for c in init_containers]
+        return {
+            'node': spec.node_name,
+            'phase': status.phase if status else None,
+            'usage': max(app_req, max(init_reqs) if init_reqs else 0),
+        }
+
+    def _node_record(self, node):
+        cap = (node.status.capacity or {}).get('nvidia.com/gpu', '0')
+        alloc = (node.status.allocatable or {}).get('nvidia.com/gpu', '0')
+        return {
+            'name': node.metadata.name,
+            'cap': int(cap) if str(cap).isdigit() else 0,
+            'alloc': int(alloc) if str(alloc).isdigit() else 0,
+        }
+
+    def _watch_pods(self):
+        while True:
+            try:
+                pod_list = self._core.list_pod_for_all_namespaces()
+                with self._lock:
+                    self._pods = {p.metadata.uid: self._pod_record(p) for p in pod_list.items}
+                self._ready.set()
+                rv = pod_list.metadata.resource_version
+                deadline = time.monotonic() + RESYNC_INTERVAL_SECS
+                w = watch.Watch()
+                for event in w.stream(self._core.list_pod_for_all_namespaces,
+                                      resource_version=rv, timeout_seconds=WATCH_TIMEOUT_SECS):
+                    obj = event['object']
+                    with self._lock:
+                        if event['type'] == 'DELETED':
+                            self._pods.pop(obj.metadata.uid, None)
+                        else:
+                            self._pods[obj.metadata.uid] = self._pod_record(obj)
+                    self._notify('pod')
+                    if time.monotonic() > deadline:
+                        w.stop()
+            except Exception as e:
+                print(f"cluster_cache: pod watch error, relisting: {e}")
+                time.sleep(5)
+
+    def _watch_nodes(self):
+        while True:
+            try:
+                node_list = self._core.list_node()
+                with self._lock:
+                    self._nodes = {n.metadata.name: self._node_record(n) for n in node_list.items}
+                rv = node_list.metadata.resource_version
+                deadline = time.monotonic() + RESYNC_INTERVAL_SECS
+                w = watch.Watch()
+                for event in w.stream(self._core.list_node,
+                                      resource_version=rv, timeout_seconds=WATCH_TIMEOUT_SECS):
+                    obj = event['object']
+                    with self._lock:
+                        if event['type'] == 'DELETED':
+                            self._nodes.pop(obj.metadata.name, None)
+                        else:
+                            self._nodes[obj.metadata.name] = self._node_record(obj)
+                    self._notify('node')
+                    if time.monotonic() > deadline:
+                        w.stop()
+            except Exception as e:
+                print(f"cluster_cache: node watch error, relisting: {e}")
+                time.sleep(5)
+
+    # ----- snapshots -----
+
+    def snapshot_free_nodes(self):
+        """
+        Returns the same (results, totals) tuple as utils.functions.get_free_nodes,
+        computed from the cached pods/nodes instead of fresh kubectl listings.
+        """
+        with self._lock:
+            pods = list(self._pods.values())
+            nodes = list(self._nodes.values())
+
+        node_usage = {}
+        for pod in pods:
+            if not pod['node'] or pod['phase'] in ("Succeeded", "Failed"):
+                continue
+            node_usage[pod['node']] = node_usage.get(pod['node'], 0) + pod['usage']
+
+        results = []
+        totals = {'cap': 0, 'alloc': 0, 'used': 0, 'free': 0}
+        for n in sorted(nodes, key=lambda x: x['name']):
+            if 'hgx' not in n['name']:
+                continue
+            used = node_usage.get(n['name'], 0)
+            free = n['alloc'] - used
+            results.append({'node': n['name'], 'cap': n['cap'], 'alloc': n['alloc'], 'used': used, 'free': free})
+            totals['cap'] += n['cap']
+            totals['alloc'] += n['alloc']
+            totals['used'] += used
+            totals['free'] += free
+        return results, totals
+
+
+_cache = ClusterCache()
+
+
+def start():
+    _cache.start()
+
+
+def snapshot_free_nodes():
+    _cache.start()
+    return _cache.snapshot_free_nodes()
+
+
+def subscribe():
+    _cache.start()
+    return _cache.subscribe()
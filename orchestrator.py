@@ -0,0 +1,385 @@
+# Scripted version of the job-runner.ipynb flow:
+# 1. get free nodes  2. get DB latest status  3. build priority queue
+# 4. submit batches  5. monitor until done
+#
+# Cluster state comes from the watch-based cluster_cache when the kubernetes
+# client is available, falling back to the kubectl path in utils.functions.
+
+import atexit
+import logging
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+# Direct bindings instead of module-attribute lookups: call sites resolve a
+# local global, which CPython 3.11+ specializes with inline caches.
+from utils.functions import (JOB_FAILED, JOB_SUBMITTED,
+                             build_priority_queue as _build_priority_queue,
+                             create_jobs, delete_jobs, get_db_status_map,
+                             get_free_node_list as _kubectl_free_node_list,
+                             get_free_nodes as _kubectl_free_nodes,
+                             get_jobs_status)
+
+try:
+    import cluster_cache
+except ImportError:
+    cluster_cache = None
+
+HOME_DIR = current_dir
+BATCH_SIZE = 2
+MONITOR_TIMEOUT_MINS = 2
+TEMPLATE_PATH = os.path.join(HOME_DIR, "ymls/specific-node-job.yml")
+DAYS_THRESHOLD = 7
+NODE_CHECK_INTERVAL_MINS = 5
+
+log = logging.getLogger("orchestrator")
+
+
+def _setup_logging():
+    """
+    Queue-based logging: producers enqueue records and return immediately,
+    while one background listener thread does the actual stream writes, so a
+    burst of per-job log lines never stalls the orchestration loop on I/O.
+    """
+    if log.handlers:
+        return
+    record_queue = queue.Queue(-1)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%H:%M:%S"))
+    listener = QueueListener(record_queue, handler)
+    log.addHandler(QueueHandler(record_queue))
+    log.setLevel(logging.INFO)
+    listener.start()
+    atexit.register(listener.stop)
+
+
+def _informer():
+    """cluster_cache when importable and credentials load, else None.
+
+    Mirrors utils.functions._core_api: the first failed config load drops
+    the informer for the process and every caller takes the kubectl path.
+    """
+    global cluster_cache
+    if cluster_cache is not None:
+        try:
+            cluster_cache.start()
+        except Exception as e:
+            log.warning("cluster_cache unavailable (%s); using kubectl", e)
+            cluster_cache = None
+    return cluster_cache
+
+
+def get_free_nodes():
+    """Cluster-wide (results, totals), from the informer cache when available."""
+    if _informer() is not None:
+        return cluster_cache.snapshot_free_nodes()
+    return _kubectl_free_nodes()
+
+
+def get_free_node_list():
+    if _informer() is not None:
+        nodes, _ = cluster_cache.snapshot_free_nodes()
+        return [n['node'] for n in nodes if n['free'] == n['alloc'] and n['alloc'] > 0]
+    # Shares the module-level TTL snapshot in utils.functions, so this and
+    # any direct utils.functions caller within 30s hit one kubectl listing.
+    return _kubectl_free_node_list()
+
+
+# Set by the SIGTERM handler; every long wait checks it, so shutdown takes
+# effect within one poll interval instead of sleeping the full cycle out.
+_shutdown = threading.Event()
+_events = None  # cluster_cache subscriber queue, when the informer is available
+
+
+def _handle_sigterm(signum, frame):
+    _shutdown.set()
+    if _events is not None:
+        _events.put('shutdown')
+
+
+DB_STATUS_TTL_SECS = 30
+_db_status_cache = {'ts': 0.0, 'data': {}, 'scope': None}
+
+
+def get_latest_results(ns="gcr-admin", ttl=DB_STATUS_TTL_SECS, refresh=False, nodes=None):
+    """
+    Latest-status map from the validation DB, cached for a short TTL so
+    back-to-back cycles (event-driven wakeups) don't re-query the pod.
+    Scoped to `nodes` when given, so the query cost tracks the free-node
+    count rather than the whole cluster's history.
+    """
+    now = time.monotonic()
+    scope = frozenset(nodes) if nodes is not None else None
+    if (not refresh and _db_status_cache['data'] and _db_status_cache['scope'] == scope
+            and now - _db_status_cache['ts'] < ttl):
+        return _db_status_cache['data']
+    # Aggregated in SQLite: one {node: max_ts} row per node, no text re-parse
+    data = get_db_status_map(namespace=ns, nodes=nodes)
+    _db_status_cache['ts'] = now
+    _db_status_cache['data'] = data
+    _db_status_cache['scope'] = scope
+    return data
+
+
+class Cluster:
+    def __init__(self, ns="gcr-admin"):
+        self.ns = ns
+        self.timestamp = int(time.time())
+        self.freenode_list = []
+        self.db_status = {}
+        self.job_queue = []
+        # Jobs are consumed in priority order, so finished entries form a
+        # prefix; this cursor skips them in O(1) amortized instead of
+        # rescanning the whole queue every batch.
+        self._queue_pos = 0
+        self.template_path = TEMPLATE_PATH
+        self.home_dir = HOME_DIR
+        self.batch_size = BATCH_SIZE
+        self.monitor_timeout_mins = MONITOR_TIMEOUT_MINS
+        self.days_threshold = DAYS_THRESHOLD
+
+    def refresh_state(self):
+        """
+        Step 1 & 2: Get free nodes and latest DB status.
+        """
+        log.info("Refreshing cluster state...")
+
+        self.freenode_list = get_free_node_list()
+        log.info("  Found %d free nodes (fully available).", len(self.freenode_list))
+
+        log.info("  Fetching DB status from cluster...")
+        try:
+            self.db_status = get_latest_results(ns=self.ns, nodes=self.freenode_list)
+            log.info("  Retrieved status for %d nodes from DB.", len(self.db_status))
+        except Exception as e:
+            log.error("  Error fetching DB status: %s", e)
+            self.db_status = {}
+
+    def build_priority_queue(self, days_threshold=None, shuffle=False):
+        """
+        Step 3: Build a priority queue filtering free nodes by age of last test.
+        """
+        if not self.freenode_list:
+            log.info("No free nodes to queue.")
+            self.job_queue = []
+            return []
+
+        log.info("Building priority queue (Threshold: %s days, Shuffle: %s)...", days_threshold, shuffle)
+        self.job_queue = _build_priority_queue(
+            self.freenode_list,
+            self.db_status,
+            days_threshold=days_threshold if days_threshold is not None else self.days_threshold,
+            shuffle=shuffle,
+            current_time=time.time()
+        )
+
+        self._queue_pos = 0
+        log.info("  Queue built: %d job candidates.", len(self.job_queue))
+        return self.job_queue
+
+    def _pending_jobs(self):
+        """Unsubmitted tail of the queue, advancing the done-prefix cursor."""
+        q = self.job_queue
+        pos = self._queue_pos
+        while pos < len(q) and q[pos][2]:
+            pos += 1
+        self._queue_pos = pos
+        return q[pos:]
+
+    def run_batch(self, batch_size=None, monitor_timeout_mins=None, dry_run=False):
+        """
+        Step 4 & 5: Submit a batch of jobs AND monitor them.
+        """
+        batch_size = batch_size if batch_size is not None else self.batch_size
+        monitor_timeout_mins = monitor_timeout_mins if monitor_timeout_mins is not None else self.monitor_timeout_mins
+
+        if not self.job_queue:
+            log.info("Job queue is empty.")
+            return
+
+        log.info("Processing batch (Size: %d)...", batch_size)
+
+        pending_jobs = self._pending_jobs()
+        if not pending_jobs:
+            log.info("  No pending jobs in queue.")
+            return
+
+        if not os.path.exists(self.template_path):
+            log.error("  Error: Template not found at %s", self.template_path)
+            return
+
+        with open(self.template_path, 'r') as f:
+            template_content = f.read()
+
+        active_batch_jobs = []  # {'job_name': str, 'node': str, 'start_time': float monotonic, 'item_ref': list}
+        staged = []  # {'job_name', 'node', 'path', 'item_ref'} rendered but not yet applied
+
+        # One epoch reading per batch: consistent job names, fewer clock calls
+        batch_epoch = int(time.time())
+
+        # One mkdir for the whole batch, not one per rendered job
+        temp_dir = os.path.join(self.home_dir, "gitignored")
+        if not dry_run:
+            os.makedirs(temp_dir, exist_ok=True)
+
+        # --- RENDER LOOP ---
+        for job_info in pending_jobs[:batch_size]:
+            node_name = job_info[0]
+            ts = batch_epoch
+            job_name = f"hari-gcr-ceval-{node_name}-{ts}"
+
+            job_yaml = template_content.replace("nodename-placeholder", node_name)
+            job_yaml = job_yaml.replace("time-placeholder", str(ts))
+            job_yaml = job_yaml.replace("generateName: jobname-placeholder", f"name: {job_name}")
+
+            log.info("  > Target: %s | Job: %s", node_name, job_name)
+
+            if dry_run:
+                log.info("    [Dry Run] Job would be submitted. (Marking as done in queue)")
+                job_info[2] = JOB_SUBMITTED
+                continue
+
+            # Save the rendered YAML for debugging/inspection
+            temp_path = os.path.join(temp_dir, f"{job_name}.yaml")
+            with open(temp_path, 'w') as temp_f:
+                temp_f.write(job_yaml)
+            staged.append({
+                'job_name': job_name,
+                'node': node_name,
+                'path': temp_path,
+                'item_ref': job_info,
+            })
+
+        if dry_run:
+            log.info("Batch dry-run complete.")
+            return
+
+        # --- SUBMISSION: whole batch in one kubectl apply ---
+        if staged:
+            try:
+                out = create_jobs([s['path'] for s in staged])
+                log.info("    Submitted batch of %d: %s", len(staged), out.strip())
+                # Monotonic for timeout arithmetic: immune to NTP steps
+                now = time.monotonic()
+                for s in staged:
+                    s['item_ref'][2] = JOB_SUBMITTED
+                    active_batch_jobs.append({
+                        'job_name': s['job_name'],
+                        'node': s['node'],
+                        'start_time': now,
+                        'item_ref': s['item_ref'],
+                    })
+            except Exception as e:
+                log.error("    Failed to submit batch: %s", e)
+                # Mark failed rather than leaving pending: the queue moves on
+                # instead of resubmitting the same batch forever; the next
+                # cycle's rebuilt queue will pick these nodes up again.
+                for s in staged:
+                    s['item_ref'][2] = JOB_FAILED
+
+        # --- MONITORING LOOP ---
+        log.info("  Scanning %d jobs for status (Timeout: %dm)...", len(active_batch_jobs), monitor_timeout_mins)
+        timeout_seconds = monitor_timeout_mins * 60
+
+        while len(active_batch_jobs) > 0:
+            log.info("  Checking specific job statuses...")
+
+            # One listing covers the whole batch; look up each job locally
+            statuses = get_jobs_status(
+                [j['job_name'] for j in active_batch_jobs], namespace=self.ns)
+
+            poll_monotonic = time.monotonic()
+            timed_out = []
+            for i in range(len(active_batch_jobs) - 1, -1, -1):
+                job = active_batch_jobs[i]
+                jname = job['job_name']
+                elapsed = poll_monotonic - job['start_time']
+
+                status = statuses.get(jname, "Unknown")
+                log.info("    [%s] Status: %s (Elapsed: %.0fs)", jname, status, elapsed)
+
+                if status in ["Completed", "Succeeded", "Failed", "Aborted", "Terminated"]:
+                    log.info("    Job %s: %s. Finished.", jname, status)
+                    active_batch_jobs.pop(i)
+                elif status == "Pending":
+                    if elapsed > timeout_seconds:
+                        log.warning("    Job %s: Timed out (%.0fs > %ds). Cancelling...", jname, elapsed, timeout_seconds)
+                        timed_out.append(jname)
+                        active_batch_jobs.pop(i)
+
+            if timed_out:
+                # All cancellations from this poll go out as one kubectl call
+                delete_jobs(timed_out, namespace=self.ns)
+
+            if not active_batch_jobs:
+                break
+
+            if _shutdown.wait(60):  # Poll every minute, wake instantly on SIGTERM
+                log.info("  Shutdown requested; leaving batch monitoring.")
+                break
+
+        log.info("Batch monitoring complete.")
+
+    def process_full_queue(self, batch_size=None, monitor_timeout_mins=None, dry_run=False):
+        """
+        Runs multiple batches until the queue is empty.
+        """
+        log.info("Starting Full Queue Processing (Dry Run: %s)...", dry_run)
+
+        while not _shutdown.is_set():
+            pending_jobs = self._pending_jobs()
+            if not pending_jobs:
+                log.info("No more pending jobs in the queue. All done.")
+                break
+
+            log.info("--- Batch Start (Remaining: %d) ---", len(pending_jobs))
+            self.run_batch(batch_size=batch_size, monitor_timeout_mins=monitor_timeout_mins, dry_run=dry_run)
+
+            # Short pause between batches to let the cluster stabilize
+            if not dry_run and len(pending_jobs) > (batch_size or self.batch_size):
+                time.sleep(10)
+
+    def latest_test_results(self):
+        """Helper to return the loaded DB status map."""
+        return self.db_status
+
+    def freenodes(self):
+        """Helper to return the cached free node list."""
+        return self.freenode_list
+
+
+def main():
+    global _events
+    _setup_logging()
+    cluster = Cluster()
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    # With the informer cache available, cycles are driven by real cluster
+    # events; the interval only bounds the wait when nothing changes.
+    _events = cluster_cache.subscribe() if _informer() is not None else None
+    while not _shutdown.is_set():
+        cluster.refresh_state()
+        cluster.build_priority_queue()
+        cluster.process_full_queue()
+        if _shutdown.is_set():
+            break
+        log.info("Cycle complete. Waiting up to %dm for cluster events...", NODE_CHECK_INTERVAL_MINS)
+        if _events is not None:
+            try:
+                _events.get(timeout=NODE_CHECK_INTERVAL_MINS * 60)
+            except queue.Empty:
+                pass
+        else:
+            _shutdown.wait(NODE_CHECK_INTERVAL_MINS * 60)
+    log.info("Orchestrator stopped.")
+
+
+if __name__ == "__main__":
+    main()
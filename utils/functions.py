@@ -1,11 +1,55 @@
+import atexit
+import calendar
+import csv
+import heapq
+import io
+import re
 import subprocess
+import shlex
 import json
+from array import array
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import os
+import sqlite3
 import sys
+import tempfile
 import textwrap
+import threading
 import logging
 import datetime
 import random
+import time
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # C-extension ISO parser: ~10x faster than fromisoformat and handles Z
+    from ciso8601 import parse_datetime as _parse_iso
+except ImportError:
+    if sys.version_info >= (3, 11):
+        # Python 3.11+ fromisoformat accepts the Z suffix directly
+        _parse_iso = datetime.datetime.fromisoformat
+    else:
+        # Older interpreters need the Z rewritten; decided once here so the
+        # per-call path stays branch-free
+        def _parse_iso(ts, _f=datetime.datetime.fromisoformat):
+            return _f(ts[:-1] + '+00:00') if ts.endswith('Z') else _f(ts)
+
+try:
+    from kubernetes import client as k8s_client, config as k8s_config
+    from kubernetes.stream import stream as k8s_stream
+except ImportError:
+    k8s_client = None
 
 # Configuration variables
 DEFAULT_NAMESPACE = "gcr-admin"
@@ -14,27 +58,229 @@ DEFAULT_DB_PATH = "/data/continuous_validation/metadata/validation.db"
 DEFAULT_STORAGE_DB_PATH = "/data/continuous_validation/metadata/test-storage.db"
 DEFAULT_NCCL_DB_PATH = "/data/continuous_validation/metadata/test-nccl.db"
 JOB_GROUP_LABEL = "hari-gcr-ceval"
+DEFAULT_RESULTS_ROOT = "/data/continuous_validation"
+RESULT_TESTS = ("storage", "nccl", "dltest")
+
+# Lazy %-formatting on the write/queue paths: arguments are only rendered
+# when a handler actually emits the record.  Data output (tables, CSV,
+# status lines) stays on print, since it is the CLI's product.
+log = logging.getLogger(__name__)
 
 
-def run_command(command, shell=False, check=True):
-    """Executes a shell command and returns stdout."""
+def run_command(command, check=True):
+    """Executes a command (list or string, split with shlex) and returns stdout."""
+    if isinstance(command, str):
+        command = shlex.split(command)
     try:
-        if shell:
-            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, check=check)
-        else:
-            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=check)
-        return result.stdout.decode('utf-8').strip()
+        # No shell=True: one fork for the child, never one for /bin/sh first.
+        # text=True lets subprocess decode in-flight instead of a second pass.
+        # close_fds=False enables CPython's posix_spawn fast path (no fork
+        # page-table walk); safe since our fds are non-inheritable anyway.
+        result = subprocess.run(command, capture_output=True, text=True, check=check,
+                                close_fds=False)
+        return result.stdout.strip()
     except subprocess.CalledProcessError as e:
         print(f"Error executing command: {command}")
-        print(f"Stderr: {e.stderr.decode('utf-8')}")
+        print(f"Stderr: {e.stderr}")
         raise e
 
+def run_command_bytes(command, check=True):
+    """run_command without the text conversion: raw stdout bytes.
+
+    For outputs parsed at the byte level (JSON, bytes regexes) this skips
+    the decode entirely, so only one full-size buffer ever exists.
+    """
+    if isinstance(command, str):
+        command = shlex.split(command)
+    try:
+        result = subprocess.run(command, capture_output=True, check=check, close_fds=False)
+        return result.stdout
+    except subprocess.CalledProcessError as e:
+        print(f"Error executing command: {command}")
+        print(f"Stderr: {e.stderr.decode('utf-8', 'replace')}")
+        raise e
+
+_core_v1 = None
+_core_v1_lock = threading.Lock()
+
+def _core_api():
+    """CoreV1Api over one persistent TLS session, or None without the client."""
+    global _core_v1, k8s_client
+    if k8s_client is None:
+        return None
+    if _core_v1 is None:
+        with _core_v1_lock:
+            if _core_v1 is None:
+                try:
+                    try:
+                        k8s_config.load_incluster_config()
+                    except k8s_config.ConfigException:
+                        k8s_config.load_kube_config()
+                except Exception:
+                    # No usable kubeconfig; stick with the kubectl path
+                    k8s_client = None
+                    return None
+                _core_v1 = k8s_client.CoreV1Api()
+    return _core_v1
+
+_custom_objects = None
+
+def _custom_api():
+    """CustomObjectsApi sharing the CoreV1Api ApiClient, or None without the client."""
+    global _custom_objects
+    if _core_api() is None:
+        return None
+    if _custom_objects is None:
+        with _core_v1_lock:
+            if _custom_objects is None:
+                _custom_objects = k8s_client.CustomObjectsApi(_core_v1.api_client)
+    return _custom_objects
+
+# Volcano vcjob coordinates for the CustomObjectsApi
+_VCJOB_GROUP = ("batch.volcano.sh", "v1alpha1", "jobs")
+
 def _exec_python_on_pod(python_code, pod, namespace, args=None):
     """Helper to execute python code inside a pod."""
-    cmd = ["kubectl", "exec", "-n", namespace, pod, "--", "python3", "-c", python_code]
+    command = ["python3", "-c", python_code]
     if args:
-        cmd.extend([str(a) for a in args])
-    return run_command(cmd)
+        command.extend([str(a) for a in args])
+    core = _core_api()
+    if core is not None:
+        # One exec over the client's existing TLS session; no kubectl fork
+        return k8s_stream(core.connect_get_namespaced_pod_exec, pod, namespace,
+                          command=command, stderr=True, stdin=False,
+                          stdout=True, tty=False).strip()
+    return run_command(["kubectl", "exec", "-n", namespace, pod, "--"] + command)
+
+_SIDECAR_SOURCE = None
+
+def _sidecar_source():
+    global _SIDECAR_SOURCE
+    if _SIDECAR_SOURCE is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sidecar.py')
+        with open(path, 'r') as f:
+            _SIDECAR_SOURCE = f.read()
+    return _SIDECAR_SOURCE
+
+# Sidecar wire codec: orjson when present (C parse/serialize, bytes-native,
+# which matters for wide query_batch result lines), stdlib json otherwise.
+if orjson is not None:
+    _wire_loads = orjson.loads
+    def _wire_dumps_line(obj):
+        return orjson.dumps(obj) + b'\n'
+else:
+    _wire_loads = json.loads
+    def _wire_dumps_line(obj):
+        return (json.dumps(obj) + '\n').encode('utf-8')
+
+class PodSidecar:
+    """
+    Persistent query pipe into a pod.
+
+    Spawns one `kubectl exec -i ... python3 -c <utils/sidecar.py>` process and
+    keeps its stdin/stdout open; each query is one JSON line in and one JSON
+    line out, so the exec round-trip and in-pod interpreter start-up are paid
+    once instead of per call.
+    """
+
+    def __init__(self, pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE):
+        self.pod = pod
+        self.namespace = namespace
+        self._proc = None
+
+    def _ensure(self):
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["kubectl", "exec", "-i", "-n", self.namespace, self.pod, "--",
+                 "python3", "-u", "-c", _sidecar_source()],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        return self._proc
+
+    def _roundtrip(self, payload):
+        proc = self._ensure()
+        proc.stdin.write(payload)
+        proc.stdin.flush()
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError("sidecar pipe closed")
+        return _wire_loads(line)
+
+    def query(self, db_path, sql, args=()):
+        payload = _wire_dumps_line({'db': db_path, 'sql': sql, 'args': list(args)})
+        try:
+            resp = self._roundtrip(payload)
+        except Exception:
+            # Pipe died (pod restart, network blip): restart once and retry
+            self.close()
+            resp = self._roundtrip(payload)
+        if not resp.get('ok'):
+            raise RuntimeError(f"sidecar query failed: {resp.get('error')}")
+        return resp['rows']
+
+    def query_batch(self, queries):
+        """Runs several (db_path, sql, args) queries in a single round-trip."""
+        payload = _wire_dumps_line({'batch': [{'db': db, 'sql': sql, 'args': list(args)}
+                                              for db, sql, args in queries]})
+        try:
+            resp = self._roundtrip(payload)
+        except Exception:
+            self.close()
+            resp = self._roundtrip(payload)
+        if not resp.get('ok'):
+            raise RuntimeError(f"sidecar batch failed: {resp.get('error')}")
+        return resp['results']
+
+    def close(self):
+        if self._proc is not None:
+            try:
+                self._proc.kill()
+            except Exception:
+                pass
+            self._proc = None
+
+_sidecars = {}
+
+def _get_sidecar(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE):
+    key = (pod, namespace)
+    if key not in _sidecars:
+        _sidecars[key] = PodSidecar(pod, namespace)
+    return _sidecars[key]
+
+def _format_ts_iso(ts):
+    if ts is None:
+        return ''
+    # strftime + gmtime stays in C: one string allocated, no datetime objects
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts))
+
+def open_remote_db_copy(db_path=DEFAULT_DB_PATH, pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE):
+    """
+    In-memory snapshot of a pod database for local ad-hoc queries.
+
+    Streams the file over one `kubectl exec -- cat` pipe straight into
+    sqlite3's deserialize, so no tempfile touches local disk and subsequent
+    queries run entirely from RAM.  On interpreters without
+    Connection.deserialize (added in 3.11) the bytes are spilled to a
+    tempfile instead.  The snapshot is a point-in-time copy: a concurrent
+    writer mid-transaction can leave it behind the live DB, so use the
+    sidecar for anything that must be current.
+    """
+    proc = subprocess.Popen(["kubectl", "exec", "-n", namespace, pod, "--", "cat", db_path],
+                            stdout=subprocess.PIPE, close_fds=False)
+    data = proc.stdout.read()
+    if proc.wait() != 0 or not data:
+        raise RuntimeError(f"Failed to fetch {db_path} from pod {pod}")
+    if hasattr(sqlite3.Connection, "deserialize"):
+        conn = sqlite3.connect(':memory:')
+        conn.deserialize(data)
+        return conn
+    fd, tmp = tempfile.mkstemp(suffix=".db")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    conn = sqlite3.connect(tmp)
+    # Unlink now; the open connection keeps the file alive and nothing
+    # lingers once it's closed.
+    os.unlink(tmp)
+    return conn
 
 def init_db(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_DB_PATH):
     """
@@ -56,14 +302,23 @@ def init_db(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_DB_PAT
             print(f'Directory {{db_dir}} already exists.')
 
         conn = sqlite3.connect(db_path)
-        conn.execute('PRAGMA journal_mode=WAL;')
-        conn.execute('PRAGMA synchronous=NORMAL;')
+        for pragma in {_INIT_PRAGMAS!r}:
+            conn.execute(pragma)
         # Table runs
-        conn.execute("CREATE TABLE IF NOT EXISTS runs (node TEXT NOT NULL, test TEXT NOT NULL, timestamp INTEGER NOT NULL, result TEXT NOT NULL CHECK (result IN ('pass','fail','incomplete')));")
+        conn.execute({_DDL_RUNS_TABLE!r})
         # Index on runs
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_runs_node_test_ts ON runs(node, test, timestamp);')
-        # View latest_status
-        conn.execute("CREATE VIEW IF NOT EXISTS latest_status AS SELECT r.node, r.test, r.timestamp AS latest_timestamp, r.result FROM runs r JOIN (SELECT node, test, MAX(timestamp) AS max_ts FROM runs GROUP BY node, test) x ON r.node=x.node AND r.test=x.test AND r.timestamp=x.max_ts;")
+        conn.execute({_DDL_RUNS_IDX!r})
+        # Covering descending index: latest-per-(node,test) lookups resolve
+        # as a single index seek, no table visit, no GROUP BY aggregation
+        conn.execute({_DDL_RUNS_IDX_DESC!r})
+        # latest_status as a trigger-maintained table: the AFTER INSERT
+        # trigger upserts it in the same transaction as each runs insert,
+        # and status reads stop paying a window pass over all of runs.
+        # (Drop the view older inits defined under the same name first.)
+        conn.execute('DROP VIEW IF EXISTS latest_status;')
+        conn.execute({_DDL_LATEST_STATUS_TABLE!r})
+        conn.execute({_DDL_RUNS_LATEST_TRIGGER!r})
+        conn.execute({_SQL_LATEST_STATUS_BACKFILL!r})
         conn.commit()
         print(f'Successfully initialized DB at {{db_path}}')
     except Exception as e:
@@ -92,25 +347,12 @@ def init_storage_db(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAUL
             print(f'Directory {{db_dir}} already exists.')
 
         conn = sqlite3.connect(db_path)
-        conn.execute('PRAGMA journal_mode=WAL;')
-        conn.execute('PRAGMA synchronous=NORMAL;')
+        for pragma in {_INIT_PRAGMAS!r}:
+            conn.execute(pragma)
 
-        # 1. Create Main Performance Table
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS storage_performance (
-                node TEXT NOT NULL,
-                timestamp INTEGER NOT NULL,
-                
-                iodepth_read_1file_iops REAL, iodepth_read_1file_bw REAL,
-                iodepth_write_1file_iops REAL, iodepth_write_1file_bw REAL,
-                numjobs_read_nfiles_iops REAL, numjobs_read_nfiles_bw REAL,
-                numjobs_write_nfiles_iops REAL, numjobs_write_nfiles_bw REAL,
-                randread_iops REAL, randread_bw REAL,
-                randwrite_iops REAL, randwrite_bw REAL,
-
-                PRIMARY KEY (node, timestamp)
-            );
-        ''')
+        # 1. Create Main Performance Table (one schema definition shared
+        # with the local writer path)
+        conn.execute({_DDL_STORAGE_TABLE!r})
 
         # 2. Create Index
         conn.execute('CREATE INDEX IF NOT EXISTS idx_perf_node_ts ON storage_performance(node, timestamp);')
@@ -218,19 +460,12 @@ def init_nccl_db(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_N
             print(f'Directory {{db_dir}} already exists.')
 
         conn = sqlite3.connect(db_path)
-        conn.execute('PRAGMA journal_mode=WAL;')
-        conn.execute('PRAGMA synchronous=NORMAL;')
+        for pragma in {_INIT_PRAGMAS!r}:
+            conn.execute(pragma)
 
-        # 1. Create Main Performance Table
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS nccl_performance (
-                node TEXT NOT NULL,
-                timestamp INTEGER NOT NULL,
-                busbw REAL,
-                latency REAL,
-                PRIMARY KEY (node, timestamp)
-            );
-        ''')
+        # 1. Create Main Performance Table (one schema definition shared
+        # with the local writer path)
+        conn.execute({_DDL_NCCL_TABLE!r})
 
         # 2. Create Index
         conn.execute('CREATE INDEX IF NOT EXISTS idx_nccl_node_ts ON nccl_performance(node, timestamp);')
@@ -286,129 +521,444 @@ def init_nccl_db(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_N
 # FLOW STEP 1: Get Free Node List
 # ==========================================
 
-def get_free_node_list():
-    nodes, _ = get_free_nodes()
-    return [n['node'] for n in nodes if n['free'] == n['alloc'] and n['alloc'] > 0]
-
-def get_free_nodes(verbose=False):
-    cmd_pods = ["kubectl", "get", "pods", "-A", "-o", "json"]
-    pods_json = json.loads(run_command(cmd_pods))
-    
-    node_usage = {}
-    for pod in pods_json.get('items', []):
-        node_name = pod.get('spec', {}).get('nodeName')
+def get_free_node_list(refresh=False):
+    return get_free_node_table(refresh=refresh).free_node_names()
+
+# Structure-of-arrays view of the cluster: one list of names plus parallel
+# int columns.  Scans over a whole column (free == alloc, totals) touch
+# contiguous machine ints instead of hopping between per-node dicts.
+class FreeNodeTable(namedtuple('FreeNodeTable', ['names', 'cap', 'alloc', 'used', 'free'])):
+    __slots__ = ()
+
+    def totals(self):
+        """Cluster-wide column sums: four C-level passes over int arrays."""
+        return {'cap': sum(self.cap), 'alloc': sum(self.alloc),
+                'used': sum(self.used), 'free': sum(self.free)}
+
+    def free_node_names(self):
+        """Names of fully-free GPU nodes, scanning only two columns."""
+        names, alloc, free = self.names, self.alloc, self.free
+        return [names[i] for i in range(len(names))
+                if free[i] == alloc[i] and alloc[i] > 0]
+
+def _iter_pods(stream):
+    """Yields pod dicts from a `kubectl get pods -o json` byte stream."""
+    if ijson is not None:
+        # Stream items as kubectl produces them; never materializes the full blob
+        yield from ijson.items(stream, 'items.item')
+    elif orjson is not None:
+        yield from orjson.loads(stream.read()).get('items', [])
+    else:
+        yield from json.load(stream).get('items', [])
+
+# Projection evaluated server-side: one TSV line per pod with node name,
+# per-container GPU requests, and per-init-container GPU requests.
+_PODS_JSONPATH = (
+    '{range .items[*]}{.spec.nodeName}{"\\t"}'
+    '{.spec.containers[*].resources.requests.nvidia\\.com/gpu}{"\\t"}'
+    '{.spec.initContainers[*].resources.requests.nvidia\\.com/gpu}{"\\n"}{end}'
+)
+
+def _pod_usage_from_tsv(data):
+    """Builds the per-node GPU usage map from the jsonpath TSV projection.
+
+    Accepts raw bytes or an iterable of byte lines (e.g. a live pipe), and
+    only the node name of a GPU-bearing pod is ever decoded, so the full
+    listing never exists as a second str buffer.
+    """
+    usage = defaultdict(int)
+    if isinstance(data, bytes):
+        data = data.splitlines()
+    for line in data:
+        parts = line.rstrip(b'\r\n').split(b'\t')
+        if len(parts) < 3 or not parts[0]:
+            continue
+        if not parts[1] and not parts[2]:
+            continue  # no GPU requests at all: the overwhelmingly common pod
+        app_req = sum(int(x or 0) for x in parts[1].split())
+        init_req = 0
+        for x in parts[2].split():
+            v = int(x or 0)
+            if v > init_req:
+                init_req = v
+        usage[parts[0]] += max(app_req, init_req)
+    # Accumulate on bytes keys, decode once per node rather than once per pod
+    return {name.decode('utf-8'): used for name, used in usage.items()}
+
+def _gpu_req(c):
+    """GPU request of one container spec; EAFP beats four chained .get()s."""
+    try:
+        return int(c['resources']['requests']['nvidia.com/gpu'])
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+_EMPTY = ()
+
+def _pod_usage_from_json():
+    """Fallback: full pod JSON, stream-parsed, phase filtered client-side."""
+    cmd_pods = ["kubectl", "get", "pods", "-A", "--chunk-size=500", "-o", "json"]
+    proc_pods = subprocess.Popen(cmd_pods, stdout=subprocess.PIPE, close_fds=False)
+    node_usage = defaultdict(int)
+    for pod in _iter_pods(proc_pods.stdout):
+        spec = pod['spec']
+        node_name = spec.get('nodeName')
         if not node_name:
             continue
-        phase = pod.get('status', {}).get('phase')
-        if phase in ["Succeeded", "Failed"]:
+        status = pod.get('status')
+        if status and status.get('phase') in ("Succeeded", "Failed"):
             continue
-            
-        containers = pod.get('spec', {}).get('containers', [])
-        init_containers = pod.get('spec', {}).get('initContainers', [])
-        
-        app_req = sum(int(c.get('resources', {}).get('requests', {}).get('nvidia.com/gpu', 0)) for c in containers)
-        init_reqs = [int(c.get('resources', {}).get('requests', {}).get('nvidia.com/gpu', 0)) for c in init_containers]
-        init_req = max(init_reqs) if init_reqs else 0
-        
-        usage = max(app_req, init_req)
-        node_usage[node_name] = node_usage.get(node_name, 0) + usage
 
-    cmd_nodes = ["kubectl", "get", "nodes", "--no-headers", "-o", r"custom-columns=NAME:.metadata.name,CAP:.status.capacity.nvidia\.com/gpu,ALLOC:.status.allocatable.nvidia\.com/gpu"]
-    nodes_output = run_command(cmd_nodes, check=False) 
-    
-    results = []
-    totals = {'cap': 0, 'alloc': 0, 'used': 0, 'free': 0}
-    
-    for line in nodes_output.split('\n'):
-        if not line.strip(): continue
-        if 'hgx' not in line: continue
-            
-        parts = line.split()
-        if len(parts) < 3: continue
-            
-        name = parts[0]
-        cap = int(parts[1]) if parts[1].isdigit() else 0
-        alloc = int(parts[2]) if parts[2].isdigit() else 0
+        app_req = 0
+        for c in spec.get('containers') or _EMPTY:
+            app_req += _gpu_req(c)
+        init_req = 0
+        for c in spec.get('initContainers') or _EMPTY:
+            v = _gpu_req(c)
+            if v > init_req:
+                init_req = v
+
+        node_usage[node_name] += max(app_req, init_req)
+    proc_pods.wait()
+    return node_usage
+
+# One cached cluster snapshot shared by every caller inside a tick: both
+# get_free_node_list() and the (results, totals) view hit the same fetch.
+_FREE_NODES_TTL_SECS = 30
+_free_nodes_cache = {'ts': 0.0, 'table': None}
+
+def invalidate_free_nodes_cache():
+    """Drops the cached snapshot; call after anything that changes scheduling."""
+    _free_nodes_cache['ts'] = 0.0
+    _free_nodes_cache['table'] = None
+
+def get_free_node_table(refresh=False):
+    now = time.monotonic()
+    if (not refresh and _free_nodes_cache['table'] is not None
+            and now - _free_nodes_cache['ts'] < _FREE_NODES_TTL_SECS):
+        return _free_nodes_cache['table']
+    table = _fetch_free_node_table()
+    _free_nodes_cache['ts'] = time.monotonic()
+    _free_nodes_cache['table'] = table
+    return table
+
+# Matches one custom-columns row for an HGX node: name, capacity, allocatable.
+# A bytes pattern, so the node listing is scanned undecoded.
+_NODE_ROW_RE = re.compile(rb'^(\S*hgx\S*)[ \t]+(\S+)[ \t]+(\S+)', re.MULTILINE)
+
+def _gpu_count(s):
+    """GPU column to int; '<none>' (GPU-less nodes) and garbage become 0.
+
+    EAFP on purpose: the common case is a digit string, and int() walks it
+    once, where an isdigit() probe plus int() walked it twice.
+    """
+    try:
+        return int(s)
+    except ValueError:
+        return 0
+
+def _fetch_free_node_table():
+    # --chunk-size lets the apiserver serve the list from its watch cache in pages;
+    # the field selector drops finished pods server-side so they never hit the wire.
+    cmd_pods = ["kubectl", "get", "pods", "-A", "--chunk-size=500",
+                "--field-selector=status.phase!=Succeeded,status.phase!=Failed",
+                "-o", "jsonpath=" + _PODS_JSONPATH]
+    cmd_nodes = ["kubectl", "get", "nodes", "--no-headers", "--chunk-size=500", "-o", r"custom-columns=NAME:.metadata.name,CAP:.status.capacity.nvidia\.com/gpu,ALLOC:.status.allocatable.nvidia\.com/gpu"]
+
+    # Launch both listings up front so they overlap.
+    proc_pods = subprocess.Popen(cmd_pods, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, close_fds=False)
+    proc_nodes = subprocess.Popen(cmd_nodes, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, close_fds=False)
+
+    # Parse the pod pipe as kubectl streams it, overlapping with both the
+    # apiserver transfer and the still-running nodes listing
+    node_usage = _pod_usage_from_tsv(proc_pods.stdout)
+    proc_pods.wait()
+    if proc_pods.returncode != 0:
+        # Older kubectl/apiserver without jsonpath+field-selector support
+        node_usage = _pod_usage_from_json()
+
+    nodes_output = proc_nodes.communicate()[0]
+
+    names = []
+    col_cap = array('i')
+    col_alloc = array('i')
+    col_used = array('i')
+    col_free = array('i')
+
+    # One C-level regex pass over the whole buffer: the hgx name filter and
+    # the three-column split happen inside the regex engine, so non-HGX rows
+    # never reach Python at all.
+    for name, cap_str, alloc_str in _NODE_ROW_RE.findall(nodes_output):
+        cap = _gpu_count(cap_str)
+        alloc = _gpu_count(alloc_str)
+        name = name.decode('utf-8')
         used = node_usage.get(name, 0)
-        free = alloc - used
-        
-        results.append({'node': name, 'cap': cap, 'alloc': alloc, 'used': used, 'free': free})
-        totals['cap'] += cap
-        totals['alloc'] += alloc
-        totals['used'] += used
-        totals['free'] += free
-            
-    return results, totals
+
+        names.append(name)
+        col_cap.append(cap)
+        col_alloc.append(alloc)
+        col_used.append(used)
+        col_free.append(alloc - used)
+
+    return FreeNodeTable(names, col_cap, col_alloc, col_used, col_free)
+
+def get_free_nodes(verbose=False, refresh=False):
+    """Row-oriented view over get_free_node_table for the CLI / notebook."""
+    table = get_free_node_table(refresh=refresh)
+    results = [{'node': n, 'cap': c, 'alloc': a, 'used': u, 'free': f}
+               for n, c, a, u, f in zip(table.names, table.cap, table.alloc, table.used, table.free)]
+    return results, table.totals()
 
 
 # ==========================================
 # FLOW STEP 2: Get DB Latest Status
 # ==========================================
 
-def get_db_latest_status(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_DB_PATH):
-    code = textwrap.dedent(f"""
-    import sqlite3, datetime, sys
-    db_path = '{db_path}'
+_SQL_IN_CHUNK = 500  # stay well under SQLite's bound-parameter limit
+
+def get_db_latest_status(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_DB_PATH, nodes=None):
     try:
-        conn = sqlite3.connect(db_path)
+        sidecar = _get_sidecar(pod, namespace)
+        if nodes:
+            # Scope to the nodes the caller cares about: index range scans per
+            # node instead of aggregating the whole runs history.
+            nodes = list(nodes)
+            rows = []
+            for i in range(0, len(nodes), _SQL_IN_CHUNK):
+                chunk = nodes[i:i + _SQL_IN_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows.extend(sidecar.query(
+                    db_path,
+                    f'SELECT node, test, latest_timestamp, result FROM latest_status '
+                    f'WHERE node IN ({placeholders}) ORDER BY node, test',
+                    tuple(chunk)))
+        else:
+            rows = sidecar.query(
+                db_path, 'SELECT node, test, latest_timestamp, result FROM latest_status ORDER BY node, test')
+    except Exception:
+        # One-shot fallback returns the full map — a superset of any scope
+        return _get_db_latest_status_oneshot(pod, namespace, db_path)
+
+    # Data lines only; the CLI adds its own header for human output, and
+    # parse_db_status_output never has to sniff one off.
+    lines = []
+    for node, test, ts, result in rows:
+        ts_num = int(ts) if ts is not None else ''
+        lines.append(f"{node}\t{test}\t{ts_num}\t{_format_ts_iso(ts)}\t{result}")
+    return '\n'.join(lines)
+
+def get_db_status_map(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_DB_PATH, nodes=None):
+    """
+    Newest test timestamp per node, as {node: max_ts}.
+
+    The MAX-per-node aggregation runs inside SQLite, so one row per node
+    comes back over the sidecar and no tab-separated text is re-parsed
+    client-side.  Scoped to `nodes` when given, like get_db_latest_status.
+    """
+    try:
+        sidecar = _get_sidecar(pod, namespace)
+        if nodes:
+            nodes = list(nodes)
+            out = {}
+            for i in range(0, len(nodes), _SQL_IN_CHUNK):
+                chunk = nodes[i:i + _SQL_IN_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                for node, ts in sidecar.query(
+                        db_path,
+                        f'SELECT node, MAX(latest_timestamp) FROM latest_status '
+                        f'WHERE node IN ({placeholders}) GROUP BY node',
+                        tuple(chunk)):
+                    out[node] = ts or 0
+            return out
+        return {node: ts or 0 for node, ts in sidecar.query(
+            db_path, 'SELECT node, MAX(latest_timestamp) FROM latest_status GROUP BY node')}
+    except Exception:
+        # Text fallback: full map parsed from the one-shot exec output
+        return parse_db_status_output(_get_db_latest_status_oneshot(pod, namespace, db_path))
+
+# Payloads for the one-shot fallbacks are dedented once at import time and
+# take db_path (and filters) via argv, so nothing is interpolated per call.
+_CODE_LATEST_STATUS = textwrap.dedent("""
+    import sqlite3, sys, time
+    db_path = sys.argv[1]
+    try:
+        # Read-only: latest_status is the trigger-maintained table init_db
+        # defines.  A status read must never create or mutate it.
+        conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
         conn.row_factory = sqlite3.Row
-        conn.execute("CREATE TABLE IF NOT EXISTS latest_status (node TEXT, test TEXT, latest_timestamp INTEGER, result TEXT, PRIMARY KEY (node, test))")
         rows = conn.execute('SELECT node, test, latest_timestamp, result FROM latest_status ORDER BY node, test').fetchall()
 
-        print('node\\ttest\\tlatest_timestamp_num\\tlatest_timestamp\\tresult')
         for r in rows:
             ts_num = int(r['latest_timestamp']) if r['latest_timestamp'] is not None else ''
             ts_iso = ''
             if r['latest_timestamp'] is not None:
-                ts_iso = datetime.datetime.fromtimestamp(r['latest_timestamp'], tz=datetime.timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
-            print(f"{{r['node']}}\\t{{r['test']}}\\t{{ts_num}}\\t{{ts_iso}}\\t{{r['result']}}")
+                ts_iso = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(r['latest_timestamp']))
+            print(f"{r['node']}\\t{r['test']}\\t{ts_num}\\t{ts_iso}\\t{r['result']}")
     except Exception as e:
-        print(f'Error: {{e}}', file=sys.stderr)
+        print(f'Error: {e}', file=sys.stderr)
         sys.exit(1)
     """)
-    return _exec_python_on_pod(code, pod, namespace)
+
+def _get_db_latest_status_oneshot(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_DB_PATH):
+    return _exec_python_on_pod(_CODE_LATEST_STATUS, pod, namespace, args=[db_path])
+
+def _view_csv_via_sidecar(view, db_path, pod, namespace, empty_msg):
+    """Rows of a latest-stats view through the sidecar, rendered as CSV.
+
+    Column names ride along in the same round-trip via pragma_table_info;
+    timestamps are formatted locally, so the pod does no string work.
+    """
+    cols, rows = _get_sidecar(pod, namespace).query_batch([
+        (db_path, f"SELECT name FROM pragma_table_info('{view}')", ()),
+        (db_path, f'SELECT * FROM "{view}" ORDER BY latest_timestamp DESC', ()),
+    ])
+    headers = [c[0] for c in cols]
+    if not rows or not headers:
+        return empty_msg
+    ts_cols = [i for i, h in enumerate(headers) if 'timestamp' in h]
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(headers)
+    for row in rows:
+        vals = list(row)
+        for i in ts_cols:
+            if isinstance(vals[i], int):
+                vals[i] = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(vals[i]))
+        writer.writerow(vals)
+    return buf.getvalue().strip()
+
+# The 12 fio metrics ranked in the storage report, in schema order
+_STORAGE_METRIC_COLS = (
+    'iodepth_read_1file_iops', 'iodepth_read_1file_bw',
+    'iodepth_write_1file_iops', 'iodepth_write_1file_bw',
+    'numjobs_read_nfiles_iops', 'numjobs_read_nfiles_bw',
+    'numjobs_write_nfiles_iops', 'numjobs_write_nfiles_bw',
+    'randread_iops', 'randread_bw',
+    'randwrite_iops', 'randwrite_bw',
+)
+
+_SQL_STORAGE_CURRENT = (
+    "SELECT sp.node, sp.timestamp, " + ", ".join('sp.' + c for c in _STORAGE_METRIC_COLS) +
+    " FROM storage_performance sp"
+    " JOIN (SELECT node, MAX(timestamp) AS max_ts FROM storage_performance GROUP BY node) lr"
+    " ON sp.node = lr.node AND sp.timestamp = lr.max_ts"
+    " ORDER BY sp.timestamp DESC"
+)
+
+def _percent_ranks(values):
+    """PERCENT_RANK() of each value in the list: (rank - 1) / (N - 1).
+
+    Matches SQLite semantics: ties share the rank of their first occurrence
+    and NULLs sort lowest.  One timsort per call, so ranking all 12 storage
+    metrics costs 12 sorts total instead of 12 window passes over the view.
+    """
+    n = len(values)
+    if n < 2:
+        return [0.0] * n
+    order = sorted(range(n), key=lambda i: (values[i] is not None, values[i]))
+    ranks = [0.0] * n
+    denom = float(n - 1)
+    prev = object()
+    rank = 0
+    for pos, i in enumerate(order):
+        if values[i] != prev:
+            rank = pos
+            prev = values[i]
+        ranks[i] = rank / denom
+    return ranks
+
+def _rank_storage_rows(rows):
+    """Turns (node, timestamp, *metrics) rows into the ranked report layout.
+
+    Returns (headers, rows) shaped like the old latest_node_performance_stats
+    view: node, latest_timestamp, pct_perf, then metric/metric_pct pairs.
+    """
+    n_metrics = len(_STORAGE_METRIC_COLS)
+    col_ranks = [_percent_ranks([r[2 + j] for r in rows]) for j in range(n_metrics)]
+    headers = ['node', 'latest_timestamp', 'pct_perf']
+    for m in _STORAGE_METRIC_COLS:
+        headers += [m, m + '_pct']
+    out = []
+    for i, r in enumerate(rows):
+        vals = [r[0], r[1], round(sum(col_ranks[j][i] for j in range(n_metrics)) / n_metrics, 2)]
+        for j in range(n_metrics):
+            vals += [r[2 + j], round(col_ranks[j][i], 2)]
+        out.append(vals)
+    return headers, out
 
 def get_storage_status_csv(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_STORAGE_DB_PATH):
     """
-    Fetches the latest VIEW from the storage database in CSV format.
+    Fetches the latest storage report in CSV format, ranked locally.
+
+    Only the per-node latest rows cross the wire; the 12 percentile columns
+    are computed here with one sort per metric instead of asking SQLite to
+    evaluate 12 PERCENT_RANK() windows over the view.
     """
+    try:
+        rows = _get_sidecar(pod, namespace).query(db_path, _SQL_STORAGE_CURRENT)
+        if not rows:
+            return "No results found in storage DB."
+        headers, ranked = _rank_storage_rows(rows)
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(headers)
+        for vals in ranked:
+            if isinstance(vals[1], int):
+                vals[1] = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(vals[1]))
+            writer.writerow(vals)
+        return buf.getvalue().strip()
+    except Exception:
+        return _get_storage_status_csv_oneshot(pod, namespace, db_path)
+
+def _get_storage_status_csv_oneshot(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_STORAGE_DB_PATH):
     code = textwrap.dedent(f"""
     import sqlite3, sys, datetime, os, csv
 
     db_path = '{db_path}'
+    metric_cols = {_STORAGE_METRIC_COLS!r}
     try:
         if not os.path.exists(db_path):
             print(f"Storage DB not found at {{db_path}}.")
             sys.exit(0)
 
         conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        
-        # Check if view exists
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='view' AND name='latest_node_performance_stats';")
-        if not cursor.fetchone():
-            print("View 'latest_node_performance_stats' not found.")
+        rows = conn.execute({_SQL_STORAGE_CURRENT!r}).fetchall()
+        if not rows:
+            print("No results found in storage DB.")
             sys.exit(0)
 
-        rows = conn.execute('SELECT * FROM latest_node_performance_stats ORDER BY latest_timestamp DESC').fetchall()
-
-        if rows:
-            # Output CSV
-            headers = list(rows[0].keys())
-            writer = csv.writer(sys.stdout)
-            writer.writerow(headers)
-            
-            for r in rows:
-                vals = []
-                for k in headers:
-                    val = r[k]
-                    # Convert timestamp to readable string for CSV
-                    if 'timestamp' in k and isinstance(val, int):
-                         val = datetime.datetime.fromtimestamp(val, tz=datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
-                    vals.append(val)
-                writer.writerow(vals)
-        else:
-            print("No results found in storage DB.")
+        # One sort per metric instead of 12 PERCENT_RANK() windows;
+        # semantics match SQLite (ties share a rank, NULLs lowest)
+        def percent_ranks(values):
+            n = len(values)
+            if n < 2:
+                return [0.0] * n
+            order = sorted(range(n), key=lambda i: (values[i] is not None, values[i]))
+            ranks = [0.0] * n
+            prev = object()
+            rank = 0
+            for pos, i in enumerate(order):
+                if values[i] != prev:
+                    rank = pos
+                    prev = values[i]
+                ranks[i] = rank / (n - 1)
+            return ranks
+
+        col_ranks = [percent_ranks([r[2 + j] for r in rows]) for j in range(len(metric_cols))]
+
+        headers = ['node', 'latest_timestamp', 'pct_perf']
+        for m in metric_cols:
+            headers += [m, m + '_pct']
+        writer = csv.writer(sys.stdout)
+        writer.writerow(headers)
+        for i, r in enumerate(rows):
+            ts = r[1]
+            if isinstance(ts, int):
+                ts = datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            ranks = [col_ranks[j][i] for j in range(len(metric_cols))]
+            vals = [r[0], ts, round(sum(ranks) / len(metric_cols), 2)]
+            for j in range(len(metric_cols)):
+                vals += [r[2 + j], round(ranks[j], 2)]
+            writer.writerow(vals)
 
     except Exception as e:
         print(f'Error: {{e}}', file=sys.stderr)
@@ -420,8 +970,15 @@ def get_nccl_status_csv(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DE
     """
     Fetches the latest VIEW from the NCCL database in CSV format.
     """
+    try:
+        return _view_csv_via_sidecar('latest_nccl_performance_stats', db_path,
+                                     pod, namespace, "No results found in NCCL DB.")
+    except Exception:
+        return _get_nccl_status_csv_oneshot(pod, namespace, db_path)
+
+def _get_nccl_status_csv_oneshot(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_NCCL_DB_PATH):
     code = textwrap.dedent(f"""
-    import sqlite3, sys, datetime, os, csv
+    import sqlite3, sys, os, csv
 
     db_path = '{db_path}'
     try:
@@ -430,32 +987,30 @@ def get_nccl_status_csv(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DE
             sys.exit(0)
 
         conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        
+
         # Check if view exists
         cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='view' AND name='latest_nccl_performance_stats';")
         if not cursor.fetchone():
             print("View 'latest_nccl_performance_stats' not found.")
             sys.exit(0)
 
-        rows = conn.execute('SELECT * FROM latest_nccl_performance_stats ORDER BY latest_timestamp DESC').fetchall()
-
-        if rows:
-            # Output CSV
-            headers = list(rows[0].keys())
-            writer = csv.writer(sys.stdout)
-            writer.writerow(headers)
-            
-            for r in rows:
-                vals = []
-                for k in headers:
-                    val = r[k]
-                    # Convert timestamp to readable string for CSV
-                    if 'timestamp' in k and isinstance(val, int):
-                         val = datetime.datetime.fromtimestamp(val, tz=datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
-                    vals.append(val)
-                writer.writerow(vals)
-        else:
+        # Stream straight off the cursor with the timestamp formatted by
+        # SQLite's strftime, so Python touches no row twice.  The zero-padded
+        # format sorts lexicographically in chronological order, hence the
+        # ORDER BY on the formatted column.
+        cursor = conn.execute('''
+            SELECT node,
+                   strftime('%Y-%m-%d %H:%M:%S', latest_timestamp, 'unixepoch') AS latest_timestamp,
+                   busbw, busbw_pct, latency, latency_pct
+            FROM latest_nccl_performance_stats ORDER BY latest_timestamp DESC''')
+
+        writer = None
+        for row in cursor:
+            if writer is None:
+                writer = csv.writer(sys.stdout)
+                writer.writerow([d[0] for d in cursor.description])
+            writer.writerow(row)
+        if writer is None:
             print("No results found in NCCL DB.")
 
     except Exception as e:
@@ -465,12 +1020,53 @@ def get_nccl_status_csv(pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DE
     return _exec_python_on_pod(code, pod, namespace)
 
 
+class StatusBundle:
+    """Rows from the three main-DB reads, fetched in one round-trip."""
+    def __init__(self, latest, node, history):
+        self.latest = latest
+        self.node = node
+        self.history = history
+
+def get_all_status(node=None, history_limit=20, pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_DB_PATH):
+    """
+    Fetches latest_status, one node's status, and run history with a single
+    exec round-trip instead of three.
+    """
+    q_latest = (db_path, 'SELECT node, test, latest_timestamp, result FROM latest_status ORDER BY node, test', ())
+    q_node = (db_path, 'SELECT node, test, latest_timestamp, result FROM latest_status WHERE node = ? ORDER BY node, test', (node or '',))
+    q_history = (db_path, 'SELECT node, test, timestamp, result FROM runs ORDER BY timestamp DESC LIMIT ?', (int(history_limit),))
+    try:
+        latest, node_rows, history = _get_sidecar(pod, namespace).query_batch([q_latest, q_node, q_history])
+    except Exception:
+        latest, node_rows, history = _get_all_status_oneshot(node, history_limit, pod, namespace, db_path)
+    return StatusBundle(latest, node_rows, history)
+
+_CODE_ALL_STATUS = textwrap.dedent("""
+    import sqlite3, json, sys
+    db_path, node_filter, limit = sys.argv[1], sys.argv[2], int(sys.argv[3])
+    try:
+        conn = sqlite3.connect(db_path)
+        latest = conn.execute('SELECT node, test, latest_timestamp, result FROM latest_status ORDER BY node, test').fetchall()
+        node_rows = conn.execute('SELECT node, test, latest_timestamp, result FROM latest_status WHERE node = ? ORDER BY node, test', (node_filter,)).fetchall()
+        history = conn.execute('SELECT node, test, timestamp, result FROM runs ORDER BY timestamp DESC LIMIT ?', (limit,)).fetchall()
+        print(json.dumps({'latest': latest, 'node': node_rows, 'history': history}))
+    except Exception as e:
+        print(f'Error: {e}', file=sys.stderr)
+        sys.exit(1)
+    """)
+
+def _get_all_status_oneshot(node, history_limit, pod, namespace, db_path):
+    out = _exec_python_on_pod(_CODE_ALL_STATUS, pod, namespace, args=[db_path, node or '', int(history_limit)])
+    data = json.loads(out)
+    return data['latest'], data['node'], data['history']
+
 def parse_db_status_output(output_string):
+    # Text-protocol shim for callers holding get_db_latest_status output;
+    # new code should take the map straight from get_db_status_map.
+    # Producers emit data lines only (node\ttest\tts_num\tts_iso\tresult),
+    # so there is no header to sniff off
     status_map = {}
-    lines = output_string.strip().split('\n')
-    if lines and 'node' in lines[0] and 'timestamp' in lines[0]:
-        lines = lines[1:]
-    for line in lines:
+    for line in output_string.strip().split('\n'):
         parts = line.split('\t')
         if len(parts) >= 3:
             node = parts[0]
@@ -489,29 +1085,53 @@ def parse_db_status_output(output_string):
 # FLOW STEP 3: Build Priority Queue
 # ==========================================
 
-def build_priority_queue(free_nodes_list, db_latest_status_map, days_threshold=7, shuffle=False):
-    now = datetime.datetime.now(datetime.timezone.utc).timestamp()
-    print(f"Building priority queue at {datetime.datetime.fromtimestamp(now, tz=datetime.timezone.utc).isoformat()} with threshold {days_threshold} days")
+# Queue-entry status field.  Ints instead of a mutated bool: PENDING is the
+# only falsy value, so existing `if not entry[2]` pending checks still work,
+# while FAILED stays distinguishable from SUBMITTED for reporting.
+JOB_PENDING, JOB_SUBMITTED, JOB_FAILED = 0, 1, 2
+
+def build_priority_queue(free_nodes_list, db_latest_status_map, days_threshold=7, shuffle=False, limit=None, current_time=None):
+    # Callers with a per-cycle timestamp pass it in; ages within one cycle
+    # are then computed against a single consistent clock reading.
+    now = current_time if current_time is not None else datetime.datetime.now(datetime.timezone.utc).timestamp()
+    log.info("Building priority queue at %s with threshold %d days",
+             datetime.datetime.fromtimestamp(now, tz=datetime.timezone.utc).isoformat(), days_threshold)
     threshold_seconds = days_threshold * 86400
+
+    if limit is not None and not shuffle:
+        # Only the top `limit` entries are consumed per cycle: feed a
+        # generator straight into the partial selection, O(N log K) with no
+        # intermediate candidate list at all
+        selected = heapq.nsmallest(
+            limit,
+            ((ts, node) for node in free_nodes_list
+             if (ts := db_latest_status_map.get(node, 0)) == 0 or now - ts > threshold_seconds))
+        return [[node, idx + 1, JOB_PENDING] for idx, (_, node) in enumerate(selected)]
+
     candidate_list = []
-    
+    skipped = 0
+
+    # Single pass: never-tested nodes carry ts=0 and naturally sort first
     for node in free_nodes_list:
         last_ts = db_latest_status_map.get(node, 0)
-        age = now - last_ts
-        if last_ts == 0 or age > threshold_seconds:
-            candidate_list.append({'node': node, 'ts': last_ts})
+        if last_ts == 0 or now - last_ts > threshold_seconds:
+            candidate_list.append((last_ts, node))
         else:
-            print(f"  Skipping node {node}: Age {age/86400:.2f} days")
-            
+            skipped += 1
+
+    # One summary line instead of a formatted print per fresh node; the
+    # skip I/O used to dominate on mostly-fresh clusters
+    if skipped:
+        log.info("  Skipped %d node(s) tested within %d days", skipped, days_threshold)
+
     if shuffle:
         random.shuffle(candidate_list)
+        if limit is not None:
+            candidate_list = candidate_list[:limit]
     else:
-        candidate_list.sort(key=lambda x: x['ts'])
-    
-    priority_queue = []
-    for idx, item in enumerate(candidate_list):
-        priority_queue.append([item['node'], idx + 1, False])
-    return priority_queue
+        candidate_list.sort()
+
+    return [[node, idx + 1, JOB_PENDING] for idx, (_, node) in enumerate(candidate_list)]
 
 
 # ==========================================
@@ -519,8 +1139,41 @@ def build_priority_queue(free_nodes_list, db_latest_status_map, days_threshold=7
 # ==========================================
 
 def create_job(yaml_file):
-    if not os.path.exists(yaml_file): raise FileNotFoundError(f"File '{yaml_file}' does not exist")
-    return run_command(["kubectl", "create", "-f", yaml_file])
+    # No pre-stat: kubectl reads the file anyway and reports a missing one
+    # ('error: the path "x.yaml" does not exist'), which we translate back
+    # to the FileNotFoundError callers expect.
+    try:
+        out = run_command(["kubectl", "create", "-f", yaml_file])
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr or b''
+        if isinstance(stderr, bytes):
+            stderr = stderr.decode('utf-8', 'replace')
+        stderr = stderr.lower()
+        if 'does not exist' in stderr or 'no such file' in stderr:
+            raise FileNotFoundError(f"File '{yaml_file}' does not exist") from e
+        raise
+    invalidate_free_nodes_cache()
+    return out
+
+def create_jobs(yaml_files):
+    """
+    Applies several job YAMLs with a single kubectl invocation: the documents
+    are concatenated with '---' separators and fed to `kubectl apply -f -`,
+    so a whole batch costs one fork and one apiserver session instead of one
+    per job.
+    """
+    if not yaml_files:
+        return ""
+    docs = []
+    for yaml_file in yaml_files:
+        with open(yaml_file, 'r') as f:
+            docs.append(f.read())
+    payload = '\n---\n'.join(docs)
+    result = subprocess.run(["kubectl", "apply", "-f", "-"],
+                            input=payload, capture_output=True, text=True, check=True,
+                            close_fds=False)
+    invalidate_free_nodes_cache()
+    return result.stdout.strip()
 
 def get_job_status(job_name, namespace=DEFAULT_NAMESPACE):
     cmd = ["kubectl", "get", "vcjob", "-n", namespace, job_name, "-o", "jsonpath={.status.state.phase}"]
@@ -530,112 +1183,667 @@ def get_job_status(job_name, namespace=DEFAULT_NAMESPACE):
     except Exception:
         return "Unknown"
 
-def delete_all_validation_jobs(confirm=False, namespace=DEFAULT_NAMESPACE, tag=JOB_GROUP_LABEL):
-    cmd_list = f'kubectl get vcjob -n {namespace} --no-headers -o custom-columns=NAME:.metadata.name | grep "{tag}"'
+def get_jobs_status(job_names, namespace=DEFAULT_NAMESPACE):
+    """
+    Phase for many vcjobs from a single kubectl listing: one apiserver
+    round-trip per poll instead of one per job.  Jobs that don't appear in
+    the listing (already deleted, not yet visible) come back as "Unknown".
+    """
+    if not job_names:
+        return {}
+    wanted = set(job_names)
+    statuses = {name: "Unknown" for name in job_names}
+    jp = '{range .items[*]}{.metadata.name}{"\\t"}{.status.state.phase}{"\\n"}{end}'
     try:
-        jobs = run_command(cmd_list, shell=True).split('\n')
-        jobs = [j.strip() for j in jobs if j.strip()]
-    except subprocess.CalledProcessError:
-        return
+        text = run_command(["kubectl", "get", "vcjob", "-n", namespace, "-o", "jsonpath=" + jp], check=False)
+    except Exception:
+        return statuses
+    for line in text.splitlines():
+        name, _, phase = line.partition('\t')
+        if name in wanted and phase:
+            statuses[name] = phase
+    return statuses
+
+def delete_all_validation_jobs(confirm=False, namespace=DEFAULT_NAMESPACE, tag=JOB_GROUP_LABEL):
+    # Jobs are not labelled, so list names and filter by the name tag in-process
+    # instead of forking a shell + grep pipeline.
+    custom = _custom_api()
+    group, version, plural = _VCJOB_GROUP
+    if custom is not None:
+        # One list + N deletes over the client's persistent TLS session; no
+        # kubectl forks.  (delete_collection needs a label selector, which
+        # these name-tagged jobs don't have.)
+        listing = custom.list_namespaced_custom_object(group, version, namespace, plural)
+        jobs = [item['metadata']['name'] for item in listing.get('items', [])
+                if tag in item['metadata']['name']]
+    else:
+        # check=False: a failed listing yields empty output and we bail on
+        # the empty job list below
+        cmd_list = ["kubectl", "get", "vcjob", "-n", namespace, "--no-headers", "-o", "custom-columns=NAME:.metadata.name"]
+        jobs = [j.strip() for j in run_command(cmd_list, check=False).split('\n') if tag in j]
     if not jobs: return
 
-    print("Found jobs to delete:", jobs)
+    log.info("Found jobs to delete: %s", jobs)
     if not confirm:
         response = input("Do you want to delete these jobs? (y/N): ")
         if response.lower() != 'y': return
 
-    for job in jobs:
-        try:
-            run_command(["kubectl", "delete", "vcjob", "-n", namespace, job])
-            print(f"Deleted {job}")
-        except Exception:
-            print(f"Failed to delete {job}")
+    if custom is not None:
+        def _delete_one(job):
+            try:
+                custom.delete_namespaced_custom_object(group, version, namespace, plural, job)
+                log.info("Deleted %s", job)
+            except Exception:
+                log.error("Failed to delete %s", job)
+
+        # Each delete blocks on an apiserver round-trip; run them in parallel
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            list(ex.map(_delete_one, jobs))
+    else:
+        # kubectl takes the whole name list in one invocation: a single fork
+        # and TLS handshake deletes every job
+        out = run_command(["kubectl", "delete", "vcjob", "-n", namespace] + jobs, check=False)
+        if out: log.info("%s", out)
+    invalidate_free_nodes_cache()
 
 def delete_job(job_name, namespace=DEFAULT_NAMESPACE):
     """
     Deletes a specific vcjob.
     """
     # Using check=False to avoid crashing if the job is already gone
-    return run_command(["kubectl", "delete", "vcjob", "-n", namespace, job_name], check=False)
+    out = run_command(["kubectl", "delete", "vcjob", "-n", namespace, job_name], check=False)
+    invalidate_free_nodes_cache()
+    return out
+
+def delete_jobs(job_names, namespace=DEFAULT_NAMESPACE):
+    """
+    Deletes several vcjobs in one kubectl invocation.
+
+    Independent deletes coalesce into a single fork and apiserver session
+    instead of one serial round-trip per job.
+    """
+    job_names = list(job_names)
+    if not job_names:
+        return ""
+    out = run_command(["kubectl", "delete", "vcjob", "-n", namespace] + job_names, check=False)
+    invalidate_free_nodes_cache()
+    return out
 
 # ==========================================
 # FLOW STEP 6: Job Execution (Inside Pod)
 # ==========================================
 
+# UTC timestamps in the two shapes our own tooling emits (ISO with optional
+# Z, and Bash %Y%m%d_%H%M%S): six int() slices + timegm, no datetime object.
+_TS_FAST_RE = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})Z?\Z|'
+    r'(\d{4})(\d{2})(\d{2})_(\d{2})(\d{2})(\d{2})\Z')
+
+@lru_cache(maxsize=4096)
+def _parse_ts_str(ts):
+    """Epoch seconds for a timestamp string, or None if unparseable.
+
+    Batch ingestion feeds highly repetitive strings, so this is memoized;
+    the fallback-to-now behavior lives in parse_timestamp where it cannot
+    be cached.
+    """
+    m = _TS_FAST_RE.match(ts)
+    if m:
+        g = m.groups()
+        if g[0] is None:
+            g = g[6:]
+        return calendar.timegm((int(g[0]), int(g[1]), int(g[2]),
+                                int(g[3]), int(g[4]), int(g[5]), 0, 0, 0))
+
+    # Anything fancier (offsets, fractional seconds) goes through the
+    # general parsers, dispatched by shape so each string pays for one
+    # parser instead of failing through both
+    if len(ts) == 15 and ts[8] == "_":
+        try:
+            d = datetime.datetime.strptime(ts, "%Y%m%d_%H%M%S")
+            return int(d.replace(tzinfo=datetime.timezone.utc).timestamp())
+        except ValueError:
+            return None
+    try:
+        d = _parse_iso(ts)
+        if d.tzinfo is None: d = d.replace(tzinfo=datetime.timezone.utc)
+        return int(d.timestamp())
+    except ValueError:
+        return None
+
 def parse_timestamp(timestamp_str):
     """Parses timestamp string from Bash (%Y%m%d_%H%M%S) or ISO format."""
     if timestamp_str is None:
         return int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-        
+
     if isinstance(timestamp_str, (int, float)):
         return int(timestamp_str)
-        
+
     ts = str(timestamp_str).strip()
     if ts.isdigit():
         return int(ts)
-        
-    # Try ISO Format
-    try:
-        if ts.endswith('Z'): ts = ts[:-1] + '+00:00'
-        d = datetime.datetime.fromisoformat(ts)
-        if d.tzinfo is None: d = d.replace(tzinfo=datetime.timezone.utc)
-        return int(d.timestamp())
-    except ValueError:
-        pass
 
-    # Try Bash Format (YYYYMMDD_HHMMSS)
-    try:
-        d = datetime.datetime.strptime(ts, "%Y%m%d_%H%M%S")
-        if d.tzinfo is None: d = d.replace(tzinfo=datetime.timezone.utc)
-        return int(d.timestamp())
-    except ValueError:
-        pass
-        
+    parsed = _parse_ts_str(ts)
+    if parsed is not None:
+        return parsed
+
     # Fallback to now if parsing fails
-    print(f"Warning: Could not parse timestamp '{timestamp_str}'. Using current time.")
+    log.warning("Could not parse timestamp '%s'. Using current time.", timestamp_str)
     return int(datetime.datetime.now(datetime.timezone.utc).timestamp())
 
-def add_result_local(node, test, result, timestamp=None, db_path=DEFAULT_DB_PATH):
-    import os, sqlite3
-    
-    timestamp = parse_timestamp(timestamp)
+# Long-lived local connections, one per DB path; avoids re-opening the file
+# and re-running PRAGMAs/DDL on every insert.
+_conn_cache = {}
+_conn_lock = threading.Lock()
 
-    db_path = os.path.abspath(str(db_path).strip())
+# Serializes write transactions across threads sharing the pooled
+# connections (check_same_thread=False): writers queue here deterministically
+# instead of interleaving statements on one handle or burning busy_timeout
+# on SQLITE_BUSY.
+_WRITE_LOCK = threading.Lock()
+_schema_ready = set()
+
+_SQL_INSERT_RUN = "INSERT INTO runs(node, test, timestamp, result) VALUES (?,?,?,?)"
+
+@lru_cache(maxsize=None)
+def _sql_latest_in(n):
+    """Canonical latest-per-(node,test) query for an n-item IN list.
+
+    Memoized so repeated chunk sizes hand the connection the identical
+    string object, guaranteeing statement-cache hits.
+    """
+    return ("SELECT node, test, MAX(timestamp) FROM runs WHERE node IN (%s) "
+            "GROUP BY node, test" % ','.join('?' * n))
+
+# One definition of the runs schema, shared by the remote init payload and
+# the local writer path.
+_DDL_RUNS_TABLE = ("CREATE TABLE IF NOT EXISTS runs (node TEXT NOT NULL, test TEXT NOT NULL, "
+                   "timestamp INTEGER NOT NULL, result TEXT NOT NULL CHECK (result IN ('pass','fail','incomplete')));")
+_DDL_RUNS_IDX = "CREATE INDEX IF NOT EXISTS idx_runs_node_test_ts ON runs(node, test, timestamp);"
+_DDL_RUNS_IDX_DESC = "CREATE INDEX IF NOT EXISTS idx_runs_node_test_ts_desc ON runs(node, test, timestamp DESC, result);"
+# latest_status is a trigger-maintained table: the AFTER INSERT trigger
+# upserts it inside the same transaction as the runs insert (pure C, no
+# second statement from Python), and status reads become a lookup over one
+# row per (node, test) instead of a window pass over all of runs.
+_DDL_LATEST_STATUS_TABLE = ("CREATE TABLE IF NOT EXISTS latest_status (node TEXT NOT NULL, test TEXT NOT NULL, "
+                            "latest_timestamp INTEGER NOT NULL, result TEXT NOT NULL, PRIMARY KEY (node, test));")
+_DDL_RUNS_LATEST_TRIGGER = ("CREATE TRIGGER IF NOT EXISTS trg_runs_latest AFTER INSERT ON runs BEGIN "
+                            "INSERT INTO latest_status (node, test, latest_timestamp, result) "
+                            "VALUES (NEW.node, NEW.test, NEW.timestamp, NEW.result) "
+                            "ON CONFLICT(node, test) DO UPDATE SET "
+                            "latest_timestamp = NEW.timestamp, result = NEW.result "
+                            "WHERE NEW.timestamp >= latest_status.latest_timestamp; END;")
+# Backfill for databases that predate the trigger (or carried the old view)
+_SQL_LATEST_STATUS_BACKFILL = ("INSERT INTO latest_status (node, test, latest_timestamp, result) "
+                               "SELECT node, test, timestamp, result "
+                               "FROM (SELECT node, test, timestamp, result, "
+                               "ROW_NUMBER() OVER (PARTITION BY node, test ORDER BY timestamp DESC) rn FROM runs) "
+                               "WHERE rn = 1 "
+                               "ON CONFLICT(node, test) DO UPDATE SET "
+                               "latest_timestamp = excluded.latest_timestamp, result = excluded.result "
+                               "WHERE excluded.latest_timestamp >= latest_status.latest_timestamp;")
+
+# Likewise for the two performance DBs: the same CREATE TABLE text backs the
+# remote init payloads and the local writers.
+_DDL_STORAGE_TABLE = ("CREATE TABLE IF NOT EXISTS storage_performance (node TEXT NOT NULL, timestamp INTEGER NOT NULL, "
+                      + ", ".join(c + " REAL" for c in _STORAGE_METRIC_COLS)
+                      + ", PRIMARY KEY (node, timestamp));")
+_DDL_NCCL_TABLE = ("CREATE TABLE IF NOT EXISTS nccl_performance (node TEXT NOT NULL, timestamp INTEGER NOT NULL, "
+                   "busbw REAL, latency REAL, PRIMARY KEY (node, timestamp));")
+
+# Server-grade connection profile shared by the remote init payloads and the
+# local writer pool: WAL for concurrent readers, a large page cache plus mmap
+# so latest-status scans stay memory-resident, and a busy timeout so
+# concurrent writers queue instead of erroring out.
+_INIT_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA cache_size=-65536;",  # 64 MiB, sized for the pvc-access pod
+    "PRAGMA mmap_size=268435456;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA busy_timeout=5000;",
+    "PRAGMA wal_autocheckpoint=1000;",
+)
+
+# Directories already created this process: one set probe replaces the
+# stat/mkdir syscalls makedirs pays even when the tree exists.
+_ensured_dirs = set()
+
+def _ensure_db_dir(db_path):
     db_dir = os.path.dirname(db_path) or "."
-    os.makedirs(db_dir, exist_ok=True)
+    if db_dir not in _ensured_dirs:
+        os.makedirs(db_dir, exist_ok=True)
+        _ensured_dirs.add(db_dir)
+
+def _get_conn(db_path):
+    """Returns a cached WAL-mode connection for db_path, creating it on first use."""
+    conn = _conn_cache.get(db_path)
+    if conn is not None:
+        return conn
+    with _conn_lock:
+        conn = _conn_cache.get(db_path)
+        if conn is None:
+            _ensure_db_dir(db_path)
+            # cached_statements doubled from the default: every hot statement
+            # stays compiled as long as callers pass the same SQL constants
+            conn = sqlite3.connect(f"file:{db_path}?mode=rwc", uri=True, timeout=30,
+                                   check_same_thread=False, cached_statements=256)
+            conn.execute("PRAGMA busy_timeout=30000;")
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
+            conn.execute("PRAGMA temp_store=MEMORY;")
+            conn.execute("PRAGMA cache_size=-65536;")  # 64 MiB page cache, warm across calls
+            conn.execute("PRAGMA mmap_size=268435456;")
+            conn.execute("PRAGMA wal_autocheckpoint=1000;")
+            _conn_cache[db_path] = conn
+    return conn
+
+# Dedicated read-only connections: under WAL, readers on their own handle
+# never contend with the writer, and query_only guards against accidental
+# writes from a read path.
+_read_conn_cache = {}
+
+def _get_read_conn(db_path):
+    conn = _read_conn_cache.get(db_path)
+    if conn is not None:
+        return conn
+    with _conn_lock:
+        conn = _read_conn_cache.get(db_path)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30,
+                                   check_same_thread=False, cached_statements=256)
+            conn.execute("PRAGMA query_only=1;")
+            conn.execute("PRAGMA busy_timeout=30000;")
+            # Readers profit from the same page cache + mmap as the writer
+            conn.execute("PRAGMA cache_size=-65536;")
+            conn.execute("PRAGMA mmap_size=268435456;")
+            _read_conn_cache[db_path] = conn
+    return conn
+
+def _conn_for_read(db_path):
+    """Read-only handle; raises sqlite3.OperationalError when the DB is absent.
+
+    Reads never create a database or run DDL: a missing file simply means
+    there is nothing to read yet, and callers treat the error as empty.
+    """
+    return _get_read_conn(db_path)
+
+def _close_all_conns():
+    with _conn_lock:
+        for conn in _conn_cache.values():
+            try:
+                conn.commit()
+                # Refresh query-planner stats for whatever this session queried
+                conn.execute("PRAGMA optimize;")
+                conn.close()
+            except Exception:
+                pass
+        for conn in _read_conn_cache.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _conn_cache.clear()
+        _read_conn_cache.clear()
+        _schema_ready.clear()
+
+atexit.register(_close_all_conns)
+
+def _ensure_runs_schema(conn, db_path):
+    """Runs the runs-table DDL exactly once per DB path."""
+    if db_path in _schema_ready:
+        return
+    with _conn_lock:
+        if db_path in _schema_ready:
+            return
+        # Probe sqlite_master first: on an existing DB the CREATE ... IF NOT
+        # EXISTS statements never even get parsed or take the schema lock
+        have = set(conn.execute(
+            "SELECT name, type FROM sqlite_master WHERE name IN "
+            "('runs','idx_runs_node_test_ts','idx_runs_node_test_ts_desc',"
+            "'latest_status','trg_runs_latest')").fetchall())
+        names = {n for n, _ in have}
+        changed = False
+        if not {'runs', 'idx_runs_node_test_ts', 'idx_runs_node_test_ts_desc'} <= names:
+            conn.execute(_DDL_RUNS_TABLE)
+            conn.execute(_DDL_RUNS_IDX)
+            conn.execute(_DDL_RUNS_IDX_DESC)
+            changed = True
+        if ('latest_status', 'table') not in have or ('trg_runs_latest', 'trigger') not in have:
+            # Older DBs carried latest_status as a view; replace it with the
+            # trigger-maintained table and backfill from runs
+            conn.execute("DROP VIEW IF EXISTS latest_status;")
+            conn.execute(_DDL_LATEST_STATUS_TABLE)
+            conn.execute(_DDL_RUNS_LATEST_TRIGGER)
+            conn.execute(_SQL_LATEST_STATUS_BACKFILL)
+            changed = True
+        if changed:
+            conn.commit()
+        _schema_ready.add(db_path)
+
+def _ensure_table_once(conn, db_path, table, ddl):
+    """Single-table version of _ensure_runs_schema for the performance DBs.
+
+    After the first call per (path, table) the writers skip straight to
+    their INSERT: no sqlite_master walk, no schema lock, no DDL parse.
+    """
+    key = (db_path, table)
+    if key in _schema_ready:
+        return
+    with _conn_lock:
+        if key in _schema_ready:
+            return
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table,)).fetchone():
+            conn.execute(ddl)
+            conn.commit()
+        _schema_ready.add(key)
+
+def add_results_local(rows, db_path=DEFAULT_DB_PATH):
+    """
+    Adds many (node, test, result, timestamp) results in one transaction.
 
-    conn = None
+    Timestamps accept anything parse_timestamp does.  N results cost a
+    single WAL fsync via insert_runs_bulk instead of one per row.
+    """
+    prepared = [(node, test, parse_timestamp(ts), result)
+                for node, test, result, ts in rows]
+    return insert_runs_bulk(prepared, db_path=db_path)
+
+def add_result_local(node, test, result, timestamp=None, db_path=DEFAULT_DB_PATH):
+    timestamp = parse_timestamp(timestamp)
     try:
-        conn = sqlite3.connect(f"file:{db_path}?mode=rwc", uri=True, timeout=30)
-        conn.execute("PRAGMA busy_timeout=30000;")
-        conn.execute("PRAGMA journal_mode=DELETE;")
-        conn.execute("PRAGMA synchronous=FULL;")
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS runs (
-              node TEXT NOT NULL,
-              test TEXT NOT NULL,
-              timestamp INTEGER NOT NULL,
-              result TEXT NOT NULL CHECK (result IN ('pass','fail','incomplete'))
-            );
-        """)
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_node_test_ts ON runs(node, test, timestamp);")
-        conn.execute("INSERT INTO runs(node, test, timestamp, result) VALUES (?,?,?,?)", (node, test, timestamp, result))
-        conn.commit()
-        print(f"Added: {node} {test} {result} {timestamp}")
+        add_results_local([(node, test, result, timestamp)], db_path=db_path)
+        log.info("Added: %s %s %s %s", node, test, result, timestamp)
     except Exception as e:
-        print(f"Error adding result: {e}")
+        log.error("Error adding result: %s", e)
         raise
-    finally:
-        if conn: conn.close()
+
+# In-process view of the newest run per (node, test), one dict per DB path.
+# Loaded from the DB on first use, then maintained inline by the insert
+# paths: this process wrote the only rows it doesn't already know about, so
+# repeat latest-status lookups never need another SQL round-trip.
+_latest_local = {}
+
+def _note_latest(db_path, rows):
+    cache = _latest_local.get(db_path)
+    if cache is None:
+        return
+    for node, test, ts, result in rows:
+        cur = cache.get((node, test))
+        if cur is None or ts >= cur[0]:
+            cache[(node, test)] = (ts, result)
+
+def get_latest_results_local(db_path=DEFAULT_DB_PATH):
+    """
+    {(node, test): (timestamp, result)} for the newest run of each pair.
+    Hits the DB once per process; afterwards the map is kept current by
+    add_result_local/insert_runs_bulk.  Returns a snapshot copy.
+    """
+    db_path = os.path.abspath(str(db_path).strip())
+    cache = _latest_local.get(db_path)
+    if cache is None:
+        cache = {}
+        conn = _conn_for_read(db_path)
+        try:
+            for node, test, ts, result in conn.execute(
+                    "SELECT node, test, MAX(timestamp), result FROM runs GROUP BY node, test"):
+                cache[(node, test)] = (ts, result)
+        except sqlite3.OperationalError:
+            pass
+        _latest_local[db_path] = cache
+    return dict(cache)
+
+def insert_runs_bulk(rows, db_path=DEFAULT_DB_PATH):
+    """
+    Inserts many (node, test, timestamp, result) tuples in one transaction.
+    BEGIN IMMEDIATE takes the write lock up front (no SQLITE_BUSY upgrade
+    mid-batch) and a single COMMIT means one WAL fsync for the whole batch
+    instead of one per row.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    db_path = os.path.abspath(str(db_path).strip())
+    conn = _get_conn(db_path)
+    _ensure_runs_schema(conn, db_path)
+    with _WRITE_LOCK:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(_SQL_INSERT_RUN, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    _note_latest(db_path, rows)
+    return len(rows)
+
+def query_latest_for_nodes(nodes, db_path=DEFAULT_DB_PATH):
+    """
+    Local high-water marks {(node, test): max_timestamp} for just the given
+    nodes.  A parameterized IN query (chunked under the bound-parameter
+    limit) rides idx_runs_node_test_ts instead of aggregating the whole
+    runs table.
+    """
+    nodes = list(nodes)
+    if not nodes:
+        return {}
+    db_path = os.path.abspath(str(db_path).strip())
+    out = {}
+    try:
+        conn = _conn_for_read(db_path)
+        for i in range(0, len(nodes), _SQL_IN_CHUNK):
+            chunk = nodes[i:i + _SQL_IN_CHUNK]
+            # MAX over idx_runs_node_test_ts_desc is an index-only scan: SQLite
+            # reads the first entry of each (node, test) group straight from the
+            # covering index without visiting the table.
+            for node, test, ts in conn.execute(_sql_latest_in(len(chunk)), chunk):
+                out[(node, test)] = ts
+    except sqlite3.OperationalError:
+        # DB or runs table not created yet
+        return {}
+    return out
+
+def query_latest_run(node, test, db_path=DEFAULT_DB_PATH):
+    """Most recent (timestamp, result) for one (node, test), or None."""
+    db_path = os.path.abspath(str(db_path).strip())
+    try:
+        return _conn_for_read(db_path).execute(
+            "SELECT timestamp, result FROM runs WHERE node = ? AND test = ? "
+            "ORDER BY timestamp DESC LIMIT 1", (node, test)).fetchone()
+    except sqlite3.OperationalError:
+        return None
+
+# Captures the six timestamp fields in one C-level pass; no intermediate
+# split lists and no strptime format interpretation per name.
+_RUN_DIR_TS_RE = re.compile(r'-(\d{4})(\d{2})(\d{2})_(\d{2})(\d{2})(\d{2})\Z')
+
+@lru_cache(maxsize=8192)
+def _parse_run_dir_ts(name):
+    """Timestamp from a '<test>-<node>-<YYYYMMDD_HHMMSS>' run dir name, or 0."""
+    m = _RUN_DIR_TS_RE.search(name)
+    if not m:
+        return 0
+    y, mo, d, h, mi, s = map(int, m.groups())
+    try:
+        return int(datetime.datetime(y, mo, d, h, mi, s, tzinfo=datetime.timezone.utc).timestamp())
+    except ValueError:
+        return 0
+
+def iter_result_logs(results_root=DEFAULT_RESULTS_ROOT, latest_map=None, tests=RESULT_TESTS):
+    """
+    Yields (node, test, ts, log_path) for run logs newer than the per-(node,
+    test) high-water mark in latest_map.  Each directory level is one
+    os.scandir pass (a single getdents batch, no per-entry stat), and the run
+    timestamp comes from the directory name itself, so skipping an
+    already-ingested run costs no syscall at all — an unchanged tree is
+    O(dirs), not O(files).
+    """
+    latest_map = latest_map or {}
+    for test in tests:
+        test_dir = os.path.join(results_root, test)
+        try:
+            node_entries = os.scandir(test_dir)
+        except FileNotFoundError:
+            continue
+        with node_entries:
+            for node_entry in node_entries:
+                if not node_entry.is_dir(follow_symlinks=False):
+                    continue
+                node = node_entry.name
+                floor = latest_map.get((node, test), 0)
+                with os.scandir(node_entry.path) as runs:
+                    for run in runs:
+                        if not run.is_dir(follow_symlinks=False):
+                            continue
+                        ts = _parse_run_dir_ts(run.name)
+                        if ts <= floor:
+                            continue
+                        # Find the log via one more scandir batch and hand the
+                        # DirEntry forward: its cached stat spares classify_log
+                        # a separate stat() round-trip per file.
+                        log_name = run.name + '.log'
+                        log_entry = None
+                        with os.scandir(run.path) as files:
+                            for file_entry in files:
+                                if file_entry.name == log_name:
+                                    log_entry = file_entry
+                                    break
+                        yield node, test, ts, (log_entry if log_entry is not None
+                                               else os.path.join(run.path, log_name))
+
+# Classification results keyed by (path, mtime_ns, size): re-scanning a tree
+# where a log hasn't changed answers from the dict instead of re-reading it.
+_classify_cache = {}
+_CLASSIFY_TAIL_BYTES = 4096
+
+def classify_log(log):
+    """Classifies a run log (a path or an os.DirEntry) as pass/fail/incomplete."""
+    try:
+        if isinstance(log, os.DirEntry):
+            log_path = log.path
+            st = log.stat(follow_symlinks=False)  # cached from the directory read
+        else:
+            log_path = log
+            st = os.stat(log_path)
+    except OSError:
+        return 'incomplete'
+    key = (log_path, st.st_mtime_ns, st.st_size)
+    cached = _classify_cache.get(key)
+    if cached is not None:
+        return cached
+    # The verdict lines are at the end of the log; a bounded tail read keeps
+    # a multi-megabyte log from being slurped and lowercased wholesale.
+    try:
+        with open(log_path, 'rb') as f:
+            if st.st_size > _CLASSIFY_TAIL_BYTES:
+                f.seek(-_CLASSIFY_TAIL_BYTES, os.SEEK_END)
+            tail = f.read().lower()
+    except OSError:
+        return 'incomplete'
+    if b'fail' in tail:
+        result = 'fail'
+    elif b'pass' in tail:
+        result = 'pass'
+    else:
+        result = 'incomplete'
+    _classify_cache[key] = result
+    return result
+
+# A run scanned mid-execution looks 'incomplete' (log absent, or the verdict
+# lines not written yet).  Inserting it would raise the per-(node,test)
+# high-water mark and the ts <= floor skip would then freeze that verdict
+# forever, so incompletes younger than this are deferred to the next scan.
+SCAN_INCOMPLETE_GRACE_SECS = 600
+
+def _run_age_secs(log, run_ts, now):
+    """Seconds since a run last showed activity: the log mtime when the log
+    exists, else the run-dir timestamp."""
+    try:
+        st = log.stat(follow_symlinks=False) if isinstance(log, os.DirEntry) else os.stat(log)
+        return now - st.st_mtime
+    except OSError:
+        return now - run_ts
+
+def scan_results(results_root=DEFAULT_RESULTS_ROOT, db_path=DEFAULT_DB_PATH):
+    """
+    Ingests finished run logs under results_root into the runs table.  Meant
+    to run inside the pvc-access pod (where both the artifact tree and the DB
+    live); only runs newer than what the DB already holds are read, and all
+    new rows land in one transaction via insert_runs_bulk.  Runs still inside
+    the incomplete grace window are left out and picked up by a later scan.
+    """
+    db_path = os.path.abspath(str(db_path).strip())
+    conn = _get_conn(db_path)
+    _ensure_runs_schema(conn, db_path)
+    latest = {(node, test): ts for node, test, ts in conn.execute(
+        "SELECT node, test, MAX(timestamp) FROM runs GROUP BY node, test")}
+
+    survivors = list(iter_result_logs(results_root, latest))
+    if survivors:
+        # Per-log classification is open/read/close with no ordering between
+        # files; on a network-mounted PVC the open latency dominates, so issue
+        # the reads concurrently (bounded, to not swamp the fileserver).
+        with ThreadPoolExecutor(max_workers=16) as ex:
+            verdicts = list(ex.map(classify_log, [s[3] for s in survivors], chunksize=32))
+        now = time.time()
+        pending = []
+        deferred = 0
+        for (node, test, ts, log_ref), verdict in zip(survivors, verdicts):
+            if (verdict == 'incomplete'
+                    and _run_age_secs(log_ref, ts, now) < SCAN_INCOMPLETE_GRACE_SECS):
+                deferred += 1
+                continue
+            pending.append((node, test, ts, verdict))
+        if deferred:
+            log.info("Deferred %d in-flight run(s) within the %ds grace window",
+                     deferred, SCAN_INCOMPLETE_GRACE_SECS)
+    else:
+        pending = []
+
+    inserted = insert_runs_bulk(pending, db_path=db_path)
+    log.info("Scanned %s: %d new results", results_root, inserted)
+    return inserted
+
+# The four scalars we keep out of a fio JSON, as ijson event prefixes
+_FIO_WANTED = ('jobs.item.read.iops', 'jobs.item.read.bw',
+               'jobs.item.write.iops', 'jobs.item.write.bw')
+
+def _fio_job_metrics(fpath):
+    """(iops, bw) read+write totals for the first job of one fio JSON.
+
+    With ijson the file is scanned as an event stream: the four scalars are
+    plucked out as they appear and parsing stops at the end of the first
+    job, so fio's clat_percentiles/histogram trees are never materialized.
+    Falls back to a plain json.load of the document otherwise.
+    """
+    with open(fpath, 'rb') as f:
+        if ijson is not None:
+            vals = {}
+            for prefix, event, value in ijson.parse(f):
+                if event == 'number' and prefix in _FIO_WANTED and prefix not in vals:
+                    # float(): ijson yields Decimal for JSON floats
+                    vals[prefix] = float(value)
+                    if len(vals) == 4:
+                        break
+                elif event == 'end_map' and prefix == 'jobs.item':
+                    break  # first job done; later jobs never counted anyway
+            read_iops = vals.get(_FIO_WANTED[0], 0)
+            read_bw = vals.get(_FIO_WANTED[1], 0)
+            write_iops = vals.get(_FIO_WANTED[2], 0)
+            write_bw = vals.get(_FIO_WANTED[3], 0)
+        else:
+            job = json.load(f)['jobs'][0]
+            read_iops = job.get('read', {}).get('iops', 0)
+            write_iops = job.get('write', {}).get('iops', 0)
+            read_bw = job.get('read', {}).get('bw', 0)
+            write_bw = job.get('write', {}).get('bw', 0)
+    return read_iops + write_iops, read_bw + write_bw
 
 def add_storage_result_local(node, timestamp, results_dir, db_path=DEFAULT_STORAGE_DB_PATH):
-    import os, sqlite3, json
-    
     timestamp = parse_timestamp(timestamp)
 
     db_path = os.path.abspath(str(db_path).strip())
-    db_dir = os.path.dirname(db_path) or "."
-    os.makedirs(db_dir, exist_ok=True)
+    _ensure_db_dir(db_path)
 
     metrics = {
         'iodepth_read_1file_iops': 0.0, 'iodepth_read_1file_bw': 0.0,
@@ -660,46 +1868,37 @@ def add_storage_result_local(node, timestamp, results_dir, db_path=DEFAULT_STORA
         print(f"Error: Results directory {results_dir} not found.")
         sys.exit(1)
 
-    for fname, prefix in file_map.items():
-        fpath = os.path.join(results_dir, fname)
-        if os.path.exists(fpath):
-            try:
-                with open(fpath, 'r') as f:
-                    data = json.load(f)
-                    job = data['jobs'][0]
-                    read_iops = job.get('read', {}).get('iops', 0)
-                    write_iops = job.get('write', {}).get('iops', 0)
-                    read_bw = job.get('read', {}).get('bw', 0)
-                    write_bw = job.get('write', {}).get('bw', 0)
-                    
-                    metrics[f'{prefix}_iops'] = read_iops + write_iops
-                    metrics[f'{prefix}_bw'] = read_bw + write_bw
-            except Exception as e:
-                print(f"Warning: Failed to parse {fname}: {e}")
-
-    conn = None
+    tasks = [(fname, prefix, os.path.join(results_dir, fname))
+             for fname, prefix in file_map.items()
+             if os.path.exists(os.path.join(results_dir, fname))]
+
+    def _parse_one(task):
+        fname, prefix, fpath = task
+        try:
+            return prefix, _fio_job_metrics(fpath), None
+        except Exception as e:
+            return prefix, None, f"Warning: Failed to parse {fname}: {e}"
+
+    # The six fio files are independent: parse them concurrently so the
+    # phase costs roughly one file's read+parse instead of the sum
+    if tasks:
+        with ThreadPoolExecutor(max_workers=len(tasks)) as ex:
+            for prefix, parsed, warning in ex.map(_parse_one, tasks):
+                if warning is not None:
+                    print(warning)
+                else:
+                    metrics[f'{prefix}_iops'], metrics[f'{prefix}_bw'] = parsed
+
     try:
-        conn = sqlite3.connect(f"file:{db_path}?mode=rwc", uri=True, timeout=30)
-        conn.execute("PRAGMA busy_timeout=30000;")
-        conn.execute("PRAGMA journal_mode=DELETE;")
-        conn.execute("PRAGMA synchronous=FULL;")
-        
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS storage_performance (
-                node TEXT NOT NULL,
-                timestamp INTEGER NOT NULL,
-                iodepth_read_1file_iops REAL, iodepth_read_1file_bw REAL,
-                iodepth_write_1file_iops REAL, iodepth_write_1file_bw REAL,
-                numjobs_read_nfiles_iops REAL, numjobs_read_nfiles_bw REAL,
-                numjobs_write_nfiles_iops REAL, numjobs_write_nfiles_bw REAL,
-                randread_iops REAL, randread_bw REAL,
-                randwrite_iops REAL, randwrite_bw REAL,
-                PRIMARY KEY (node, timestamp)
-            );
-        ''')
-        
+        # Pooled writer connection: pragmas applied once per process, and
+        # the handle (plus its page cache) stays warm across inserts
+        conn = _get_conn(db_path)
+        _ensure_table_once(conn, db_path, 'storage_performance', _DDL_STORAGE_TABLE)
+
+        # Native UPSERT: the conflicting row is updated in place instead of
+        # the DELETE+INSERT pair INSERT OR REPLACE performs
         sql = '''
-            INSERT OR REPLACE INTO storage_performance (
+            INSERT INTO storage_performance (
                 node, timestamp,
                 iodepth_read_1file_iops, iodepth_read_1file_bw,
                 iodepth_write_1file_iops, iodepth_write_1file_bw,
@@ -708,6 +1907,19 @@ def add_storage_result_local(node, timestamp, results_dir, db_path=DEFAULT_STORA
                 randread_iops, randread_bw,
                 randwrite_iops, randwrite_bw
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(node, timestamp) DO UPDATE SET
+                iodepth_read_1file_iops=excluded.iodepth_read_1file_iops,
+                iodepth_read_1file_bw=excluded.iodepth_read_1file_bw,
+                iodepth_write_1file_iops=excluded.iodepth_write_1file_iops,
+                iodepth_write_1file_bw=excluded.iodepth_write_1file_bw,
+                numjobs_read_nfiles_iops=excluded.numjobs_read_nfiles_iops,
+                numjobs_read_nfiles_bw=excluded.numjobs_read_nfiles_bw,
+                numjobs_write_nfiles_iops=excluded.numjobs_write_nfiles_iops,
+                numjobs_write_nfiles_bw=excluded.numjobs_write_nfiles_bw,
+                randread_iops=excluded.randread_iops,
+                randread_bw=excluded.randread_bw,
+                randwrite_iops=excluded.randwrite_iops,
+                randwrite_bw=excluded.randwrite_bw
         '''
         
         vals = (
@@ -719,51 +1931,46 @@ def add_storage_result_local(node, timestamp, results_dir, db_path=DEFAULT_STORA
             metrics['randread_iops'], metrics['randread_bw'],
             metrics['randwrite_iops'], metrics['randwrite_bw']
         )
-        conn.execute(sql, vals)
-        conn.commit()
+        with _WRITE_LOCK:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(sql, vals)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
         print(f"Successfully added storage results for {node} at {timestamp}")
 
     except Exception as e:
         print(f"Error adding storage result: {e}")
         raise
-    finally:
-        if conn: conn.close()
 
 def add_nccl_result_local(node, timestamp, busbw, latency, db_path=DEFAULT_NCCL_DB_PATH):
-    import os, sqlite3
-    
     timestamp = parse_timestamp(timestamp)
     db_path = os.path.abspath(str(db_path).strip())
-    db_dir = os.path.dirname(db_path) or "."
-    os.makedirs(db_dir, exist_ok=True)
+    _ensure_db_dir(db_path)
 
-    conn = None
     try:
-        conn = sqlite3.connect(f"file:{db_path}?mode=rwc", uri=True, timeout=30)
-        conn.execute("PRAGMA busy_timeout=30000;")
-        conn.execute("PRAGMA journal_mode=DELETE;")
-        conn.execute("PRAGMA synchronous=FULL;")
-        
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS nccl_performance (
-                node TEXT NOT NULL,
-                timestamp INTEGER NOT NULL,
-                busbw REAL,
-                latency REAL,
-                PRIMARY KEY (node, timestamp)
-            );
-        ''')
-        
-        sql = 'INSERT OR REPLACE INTO nccl_performance (node, timestamp, busbw, latency) VALUES (?, ?, ?, ?)'
-        conn.execute(sql, (node, timestamp, float(busbw), float(latency)))
-        conn.commit()
+        # Pooled writer connection, same as the runs and storage paths
+        conn = _get_conn(db_path)
+        _ensure_table_once(conn, db_path, 'nccl_performance', _DDL_NCCL_TABLE)
+
+        # Native UPSERT: update in place rather than OR REPLACE's DELETE+INSERT
+        sql = ('INSERT INTO nccl_performance (node, timestamp, busbw, latency) VALUES (?, ?, ?, ?) '
+               'ON CONFLICT(node, timestamp) DO UPDATE SET busbw=excluded.busbw, latency=excluded.latency')
+        with _WRITE_LOCK:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(sql, (node, timestamp, float(busbw), float(latency)))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
         print(f"Successfully added NCCL results for {node} at {timestamp}: BusBW={busbw}, Latency={latency}")
 
     except Exception as e:
         print(f"Error adding NCCL result: {e}")
         raise
-    finally:
-        if conn: conn.close()
 
 
 
@@ -772,16 +1979,29 @@ def add_nccl_result_local(node, timestamp, busbw, latency, db_path=DEFAULT_NCCL_
 # ==========================================
 
 def get_cordoned_nodes():
-    """Returns a list of cordoned nodes."""
-    cmd = 'kubectl get nodes -o wide | grep -E "NAME|SchedulingDisabled|Ready.*SchedulingDisabled"'
-    return run_command(cmd, shell=True, check=False)
+    """Returns cordoned node names, filtered server-side via jsonpath."""
+    cmd = ["kubectl", "get", "nodes", "-o",
+           'jsonpath={range .items[?(@.spec.unschedulable==true)]}{.metadata.name}{"\\n"}{end}']
+    return run_command(cmd, check=False)
 
 def get_node_status(node, pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_DB_PATH):
     """Fetches status for a specific node."""
-    code = textwrap.dedent(f"""
-    import sqlite3, datetime, sys
-    db_path = '{db_path}'
-    node_filter = sys.argv[1]
+    try:
+        rows = _get_sidecar(pod, namespace).query(
+            db_path, 'SELECT node, test, latest_timestamp, result FROM latest_status WHERE node = ? ORDER BY node, test',
+            (node,))
+    except Exception:
+        return _get_node_status_oneshot(node, pod, namespace, db_path)
+
+    lines = ['node\ttest\tlatest_timestamp\tresult']
+    for n, test, ts, result in rows:
+        lines.append(f"{n}\t{test}\t{_format_ts_iso(ts)}\t{result}")
+    return '\n'.join(lines)
+
+_CODE_NODE_STATUS = textwrap.dedent("""
+    import sqlite3, sys, time
+    db_path = sys.argv[1]
+    node_filter = sys.argv[2]
     try:
         conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row
@@ -789,33 +2009,49 @@ def get_node_status(node, pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=
         rows = conn.execute(q, (node_filter,)).fetchall()
         print('node\\ttest\\tlatest_timestamp\\tresult')
         for r in rows:
-            ts = datetime.datetime.fromtimestamp(r['latest_timestamp'], tz=datetime.timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
-            print(f"{{r['node']}}\\t{{r['test']}}\\t{{ts}}\\t{{r['result']}}")
+            ts = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(r['latest_timestamp']))
+            print(f"{r['node']}\\t{r['test']}\\t{ts}\\t{r['result']}")
     except Exception as e:
-        print(f'Error: {{e}}', file=sys.stderr)
+        print(f'Error: {e}', file=sys.stderr)
         sys.exit(1)
     """)
-    return _exec_python_on_pod(code, pod, namespace, args=[node])
+
+def _get_node_status_oneshot(node, pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_DB_PATH):
+    return _exec_python_on_pod(_CODE_NODE_STATUS, pod, namespace, args=[db_path, node])
 
 def get_history(limit=20, pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_DB_PATH):
     """Fetches run history."""
-    code = textwrap.dedent(f"""
-    import sqlite3, datetime, sys
-    db_path = '{db_path}'
-    limit = int(sys.argv[1])
+    try:
+        rows = _get_sidecar(pod, namespace).query(
+            db_path, 'SELECT node, test, timestamp, result FROM runs ORDER BY timestamp DESC LIMIT ?',
+            (int(limit),))
+    except Exception:
+        return _get_history_oneshot(limit, pod, namespace, db_path)
+
+    lines = ['node\ttest\ttimestamp\tresult']
+    for node, test, ts, result in rows:
+        lines.append(f"{node}\t{test}\t{_format_ts_iso(ts)}\t{result}")
+    return '\n'.join(lines)
+
+_CODE_HISTORY = textwrap.dedent("""
+    import sqlite3, sys, time
+    db_path = sys.argv[1]
+    limit = int(sys.argv[2])
     try:
         conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row
         rows = conn.execute('SELECT node, test, timestamp, result FROM runs ORDER BY timestamp DESC LIMIT ?', (limit,)).fetchall()
         print('node\\ttest\\ttimestamp\\tresult')
         for r in rows:
-            ts = datetime.datetime.fromtimestamp(r['timestamp'], tz=datetime.timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
-            print(f"{{r['node']}}\\t{{r['test']}}\\t{{ts}}\\t{{r['result']}}")
+            ts = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(r['timestamp']))
+            print(f"{r['node']}\\t{r['test']}\\t{ts}\\t{r['result']}")
     except Exception as e:
-        print(f'Error: {{e}}', file=sys.stderr)
+        print(f'Error: {e}', file=sys.stderr)
         sys.exit(1)
     """)
-    return _exec_python_on_pod(code, pod, namespace, args=[limit])
+
+def _get_history_oneshot(limit=20, pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE, db_path=DEFAULT_DB_PATH):
+    return _exec_python_on_pod(_CODE_HISTORY, pod, namespace, args=[db_path, limit])
 
 def list_pod_files(target_dir="/data/continuous_validation", pod=DEFAULT_POD, namespace=DEFAULT_NAMESPACE):
     return run_command(["kubectl", "-n", namespace, "exec", pod, "--", "ls", "-F", target_dir])
@@ -848,15 +2084,13 @@ def agent_summary(
       base_dir: root artifacts directory (default: /data/continuous_validation)
       max_alarm_lines: cap number of alarm lines printed per test.
     """
-    import textwrap
-
     # Pass args into remote python safely (space/quote-safe)
     node_arg = node if node else "__ALL__"
     ts_arg = str(timestamp) if timestamp is not None else "__LATEST__"
     tests_arg = ",".join(tests) if tests else "nccl,storage,deeplearning_unit_test"
 
     code = textwrap.dedent(r'''
-    import os, sys, re, json, datetime
+    import os, sys, re, json, datetime, functools
 
     BASE_DIR = sys.argv[1]
     NODE = sys.argv[2]
@@ -864,27 +2098,87 @@ def agent_summary(
     TESTS = [t.strip() for t in sys.argv[4].split(",") if t.strip()]
     MAX_ALARMS = int(sys.argv[5])
 
-    # Heuristics: patterns that usually indicate node/test problems.
-    # You can tune these over time.
-    PATTERNS = [
-        ("CRITICAL", r"(?i)\b(segfault|core dumped|illegal instruction|abort|fatal|unhandled exception)\b"),
-        ("CRITICAL", r"(?i)\b(oomkilled|out of memory|cuda out of memory)\b"),
-        ("CRITICAL", r"(?i)\b(watchdog|collective operation timeout|timeout)\b"),
-        ("CRITICAL", r"(?i)\b(xid\b|gpu has fallen off the bus)\b"),
-
-        ("WARNING",  r"(?i)\b(nccl warn)\b"),
-        ("WARNING",  r"(?i)\b(error|failed|failure)\b"),
-        ("WARNING",  r"Could not find: libnccl-env\.so"),
-        ("WARNING",  r"(?i)\b(ibv_|rdma|mlx5|link down)\b"),
-    ]
-
-    def _read_text(path, max_bytes=5_000_000):
-        try:
-            with open(path, "rb") as f:
-                b = f.read(max_bytes)
-            return b.decode("utf-8", errors="replace")
-        except Exception as e:
-            return f"<<failed to read {path}: {e}>>"
+    try:
+        import ahocorasick
+    except ImportError:
+        ahocorasick = None
+
+    # Heuristics: keywords that usually indicate node/test problems.  You can
+    # tune these over time.  All of them are literal words matched
+    # case-insensitively at word boundaries; when pyahocorasick is available
+    # each line is scanned once for every keyword simultaneously, otherwise
+    # the keywords are fused into one alternation per severity so a line
+    # costs at most two regex probes.
+    CRIT_KEYWORDS = (
+        "segfault", "core dumped", "illegal instruction", "abort", "fatal",
+        "unhandled exception",
+        "oomkilled", "out of memory", "cuda out of memory",
+        "watchdog", "collective operation timeout", "timeout",
+        "xid", "gpu has fallen off the bus",
+    )
+    WARN_KEYWORDS = (
+        "nccl warn",
+        "error", "failed", "failure",
+        "ibv_", "rdma", "mlx5", "link down",
+    )
+    # Case-sensitive, not word-bounded: checked as a plain substring.
+    _NCCL_ENV_LIT = "Could not find: libnccl-env.so"
+
+    def _kw_regex(keywords, extra=""):
+        alts = "|".join(re.escape(k) for k in keywords)
+        return re.compile(rf"(?i:\b(?:{alts})\b)" + extra)
+
+    _CRIT_RE = _kw_regex(CRIT_KEYWORDS)
+    _WARN_RE = _kw_regex(WARN_KEYWORDS, "|" + re.escape(_NCCL_ENV_LIT))
+
+    if ahocorasick is not None:
+        def _kw_automaton(keywords):
+            A = ahocorasick.Automaton()
+            for kw in keywords:
+                A.add_word(kw, kw)
+            A.make_automaton()
+            return A
+
+        _CRIT_AUTO = _kw_automaton(CRIT_KEYWORDS)
+        _WARN_AUTO = _kw_automaton(WARN_KEYWORDS)
+
+        def _kw_hit(A, low):
+            # Automaton hits are substring hits; re-impose the \b semantics
+            # of the regex path by rejecting word characters on either side.
+            for end, kw in A.iter(low):
+                start = end - len(kw) + 1
+                if start and (low[start - 1].isalnum() or low[start - 1] == "_"):
+                    continue
+                nxt = end + 1
+                if nxt < len(low) and (low[nxt].isalnum() or low[nxt] == "_"):
+                    continue
+                return True
+            return False
+
+        def _line_severity(ln):
+            low = ln.lower()
+            if _kw_hit(_CRIT_AUTO, low):
+                return "CRITICAL"
+            if _kw_hit(_WARN_AUTO, low) or _NCCL_ENV_LIT in ln:
+                return "WARNING"
+            return None
+    else:
+        def _line_severity(ln):
+            if _CRIT_RE.search(ln):
+                return "CRITICAL"
+            if _WARN_RE.search(ln):
+                return "WARNING"
+            return None
+
+    # Fallback for run dirs whose trailing "-<digits>" timestamp is not a
+    # clean rsplit tail (compiled once; the fast path rarely misses)
+    _TS_RE = re.compile(r"-(\d{8,})$")
+
+    # NCCL header facts all appear in the first screenful of the log
+    _WS_RE = re.compile(r"World Size:\s*(\d+)")
+    _VER_RE = re.compile(r"NCCL version\s+([^\s]+)")
+    _BOOT_RE = re.compile(r"Bootstrap:\s+Using\s+([a-zA-Z0-9_.-]+):")
+    HEADER_LINES = 200
 
     def _read_json(path):
         try:
@@ -893,11 +2187,18 @@ def agent_summary(
         except Exception:
             return None
 
-    def _list_nodes_for_test(test_dir):
+    @functools.lru_cache(maxsize=None)
+    def _scan_dirs(path):
+        # One scandir per directory: entry.is_dir() reuses the dirent type
+        # instead of a stat per name, and the memo means the "__ALL__" node
+        # listing and the per-node run-dir pick never re-walk the same path.
         try:
-            return sorted([d for d in os.listdir(test_dir) if os.path.isdir(os.path.join(test_dir, d))])
+            return tuple(sorted((e.name, e.path) for e in os.scandir(path) if e.is_dir()))
         except FileNotFoundError:
-            return []
+            return ()
+
+    def _list_nodes_for_test(test_dir):
+        return [name for name, _ in _scan_dirs(test_dir)]
 
     def _pick_run_dir(test_dir, node, ts):
         """
@@ -907,18 +2208,19 @@ def agent_summary(
           - if ts is provided: the directory containing that ts
           - else: the newest directory by parsed timestamp suffix
         """
-        node_dir = os.path.join(test_dir, node)
-        if not os.path.isdir(node_dir):
-            return None
-
         run_dirs = []
-        for d in os.listdir(node_dir):
-            full = os.path.join(node_dir, d)
-            if os.path.isdir(full):
-                # Extract last "-<digits>" as timestamp when possible
-                m = re.search(r"-(\d{8,})$", d)
+        for d, full in _scan_dirs(os.path.join(test_dir, node)):
+            # Extract last "-<digits>" as timestamp when possible.  Run dirs
+            # follow "<test>-<node>-<ts>", so the tail after the final "-"
+            # is the timestamp; plain string ops cover that without a regex
+            # match per entry.
+            tail = d.rsplit("-", 1)[-1]
+            if tail.isdigit() and len(tail) >= 8:
+                run_ts = int(tail)
+            else:
+                m = _TS_RE.search(d)
                 run_ts = int(m.group(1)) if m else -1
-                run_dirs.append((run_ts, full))
+            run_dirs.append((run_ts, full))
 
         if not run_dirs:
             return None
@@ -952,23 +2254,39 @@ def agent_summary(
                     return os.path.join(glob_dir, name)
         return None
 
-    def _scan_alarms(text):
-        alarms = []
-        lines = text.splitlines()
-        for level, pat in PATTERNS:
-            rx = re.compile(pat)
-            for ln in lines:
-                if rx.search(ln):
-                    alarms.append((level, ln.strip()))
-        # de-dupe while preserving order
+    def _scan_alarms(path, probes=None):
+        # Stream the log line by line: only matching lines are ever kept, so
+        # peak memory is one line plus the alarms, not a 5 MB slurp plus its
+        # splitlines copy.  The worse severity wins per line; de-duped while
+        # preserving order.  `probes` ({name: regex}) are header facts looked
+        # for in the first HEADER_LINES lines of the same pass; their first
+        # capture groups come back in the second return value.
         seen = set()
         out = []
-        for lvl, ln in alarms:
-            key = (lvl, ln)
-            if key not in seen:
-                seen.add(key)
-                out.append((lvl, ln))
-        return out
+        found = {}
+        pending = dict(probes) if probes else {}
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for i, ln in enumerate(f):
+                    if pending:
+                        if i < HEADER_LINES:
+                            for key, rx in list(pending.items()):
+                                m = rx.search(ln)
+                                if m:
+                                    found[key] = m.group(1)
+                                    del pending[key]
+                        else:
+                            pending.clear()
+                    lvl = _line_severity(ln)
+                    if lvl is None:
+                        continue
+                    key = (lvl, ln.strip())
+                    if key not in seen:
+                        seen.add(key)
+                        out.append(key)
+        except Exception as e:
+            out.append(("WARNING", f"<<failed to read {path}: {e}>>"))
+        return out, found
 
     def _parse_nccl(run_dir):
         """
@@ -982,24 +2300,14 @@ def agent_summary(
                 summary_path = os.path.join(run_dir, name)
                 break
 
-        log_text = _read_text(log_path) if log_path else ""
         summary = _read_json(summary_path) if summary_path else None
 
-        world_size = None
-        m = re.search(r"World Size:\s*(\d+)", log_text)
-        if m:
-            world_size = int(m.group(1))
-
-        # Pull common NCCL info if present
-        nccl_ver = None
-        m = re.search(r"NCCL version\s+([^\s]+)", log_text)
-        if m:
-            nccl_ver = m.group(1)
-
-        bootstrap_if = None
-        m = re.search(r"Bootstrap:\s+Using\s+([a-zA-Z0-9_.-]+):", log_text)
-        if m:
-            bootstrap_if = m.group(1)
+        # Header facts and alarms in the same streaming pass over the log
+        alarms, header = ([], {})
+        if log_path:
+            alarms, header = _scan_alarms(log_path, probes={
+                "world_size": _WS_RE, "nccl_version": _VER_RE, "bootstrap_if": _BOOT_RE})
+        world_size = int(header["world_size"]) if "world_size" in header else None
 
         metrics = {}
         if isinstance(summary, dict):
@@ -1008,14 +2316,12 @@ def agent_summary(
         # Normalize keys for display
         out_metrics = {
             "world_size": world_size,
-            "nccl_version": nccl_ver,
-            "bootstrap_if": bootstrap_if,
+            "nccl_version": header.get("nccl_version"),
+            "bootstrap_if": header.get("bootstrap_if"),
             "latency_ms": metrics.get("GCR_LATENCY"),
             "algbw_gbps": metrics.get("GCR_ALGBW"),
             "busbw_gbps": metrics.get("GCR_BUSBW"),
         }
-
-        alarms = _scan_alarms(log_text) if log_text else []
         return {
             "run_dir": run_dir,
             "log_path": log_path,
@@ -1027,8 +2333,7 @@ def agent_summary(
     def _parse_storage(run_dir):
         # Skeleton: looks for a *.log and any "*summary*.json" if you add one later.
         log_path = _find_first(run_dir, (".log",))
-        log_text = _read_text(log_path) if log_path else ""
-        alarms = _scan_alarms(log_text) if log_text else []
+        alarms = _scan_alarms(log_path)[0] if log_path else []
         return {
             "run_dir": run_dir,
             "log_path": log_path,
@@ -1040,8 +2345,7 @@ def agent_summary(
     def _parse_dltest(run_dir):
         # Skeleton: same idea; tune once you decide what summary artifacts you want.
         log_path = _find_first(run_dir, (".log",))
-        log_text = _read_text(log_path) if log_path else ""
-        alarms = _scan_alarms(log_text) if log_text else []
+        alarms = _scan_alarms(log_path)[0] if log_path else []
         return {
             "run_dir": run_dir,
             "log_path": log_path,
@@ -1152,7 +2456,10 @@ def agent_summary(
 
 if __name__ == "__main__":
     import argparse
-    
+
+    # Bare-message handler so CLI output looks the way the prints did
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     parser = argparse.ArgumentParser(description="Cluster evaluation Kubectl Functions CLI")
     subparsers = parser.add_subparsers(dest="command")
 
@@ -1198,6 +2505,13 @@ if __name__ == "__main__":
     p_add.add_argument("timestamp", nargs="?", default=None)
     p_add.add_argument("--db-path", default=DEFAULT_DB_PATH)
 
+    # Command: add-results (Local, bulk)
+    p_add_many = subparsers.add_parser(
+        "add-results", help="Add many results from a TSV stream (node<TAB>test<TAB>result[<TAB>timestamp])")
+    p_add_many.add_argument("file", nargs="?", default="-",
+                            help="TSV file, or - for stdin (default)")
+    p_add_many.add_argument("--db-path", default=DEFAULT_DB_PATH)
+
     # Command: add-storage-result (Local) - NEW
     p_add_store = subparsers.add_parser("add-storage-result", help="Parse and add storage results to local DB")
     p_add_store.add_argument("node")
@@ -1213,6 +2527,11 @@ if __name__ == "__main__":
     p_add_nccl.add_argument("latency")
     p_add_nccl.add_argument("--db-path", default=DEFAULT_NCCL_DB_PATH)
 
+    # Command: scan-results (Local)
+    p_scan = subparsers.add_parser("scan-results", help="Ingest new run logs into the local DB")
+    p_scan.add_argument("results_root", nargs="?", default=DEFAULT_RESULTS_ROOT)
+    p_scan.add_argument("--db-path", default=DEFAULT_DB_PATH)
+
     # Command: init-db (General)
     p_init = subparsers.add_parser("init-db", help="Initialize Main DB")
     p_init.add_argument("--pod", default=DEFAULT_POD)
@@ -1271,6 +2590,7 @@ if __name__ == "__main__":
     elif args.command == "exec":
         exec_pod(args.pod_name, namespace=args.namespace)
     elif args.command == "status":
+        print('node\ttest\tlatest_timestamp_num\tlatest_timestamp\tresult')
         print(get_db_latest_status())
     elif args.command == "history":
         print(get_history(limit=args.limit))
@@ -1278,10 +2598,25 @@ if __name__ == "__main__":
         delete_all_validation_jobs(confirm=args.confirm, namespace=args.namespace, tag=args.tag)
     elif args.command == "add-result":
         add_result_local(args.node, args.test, args.result, args.timestamp, args.db_path)
+    elif args.command == "add-results":
+        stream = sys.stdin if args.file == "-" else open(args.file)
+        with stream:
+            rows = []
+            for line in stream:
+                parts = line.rstrip("\r\n").split("\t")
+                if len(parts) < 3 or not parts[0]:
+                    continue
+                rows.append((parts[0], parts[1], parts[2],
+                             parts[3] if len(parts) > 3 and parts[3] else None))
+        # One transaction, one WAL fsync for the whole stream
+        inserted = add_results_local(rows, db_path=args.db_path)
+        log.info("Added %d result(s)", inserted)
     elif args.command == "add-storage-result":
         add_storage_result_local(args.node, args.timestamp, args.results_dir, args.db_path)
     elif args.command == "add-nccl-result":
         add_nccl_result_local(args.node, args.timestamp, args.busbw, args.latency, args.db_path)
+    elif args.command == "scan-results":
+        scan_results(args.results_root, args.db_path)
     elif args.command == "init-db":
         print(init_db(args.pod, args.namespace, args.db_path))
     elif args.command == "delete-job":
@@ -1351,6 +2686,7 @@ if __name__ == "__main__":
         print("  python3 functions.py exec [pod]     # Exec into a pod")
         print("  python3 functions.py delete-jobs    # Delete all validation jobs")
         print("  python3 functions.py add-result NODE TEST RESULT [TIMESTAMP] [--db-path PATH]  # Add result to local DB")
+        print("  python3 functions.py add-results [FILE] [--db-path PATH]  # Bulk add from TSV (stdin with -)")
         print("  python3 functions.py create-test storage --pod POD --namespace NAMESPACE --db-path PATH  # Initialize Storage DB remotely")
         print("  python3 functions.py create-test nccl --pod POD --namespace NAMESPACE --db-path PATH      # Initialize NCCL DB remotely")
         print("  python3 functions.py add-storage-result <node> <time> <dir> # Add results")
@@ -37,6 +37,12 @@ try:
     conn = sqlite3.connect(db_path)
     # Ensure tables exist just in case
     conn.execute(\"CREATE TABLE IF NOT EXISTS runs (node TEXT NOT NULL, test TEXT NOT NULL, timestamp INTEGER NOT NULL, result TEXT NOT NULL CHECK (result IN ('pass','fail','incomplete')));\")
+    # Legacy DBs carry latest_status as a VIEW; the trigger cannot write
+    # into a view, so migrate to the table + backfill before inserting.
+    conn.execute('DROP VIEW IF EXISTS latest_status;')
+    conn.execute(\"CREATE TABLE IF NOT EXISTS latest_status (node TEXT NOT NULL, test TEXT NOT NULL, latest_timestamp INTEGER NOT NULL, result TEXT NOT NULL, PRIMARY KEY (node, test));\")
+    conn.execute(\"CREATE TRIGGER IF NOT EXISTS trg_runs_latest AFTER INSERT ON runs BEGIN INSERT INTO latest_status (node, test, latest_timestamp, result) VALUES (NEW.node, NEW.test, NEW.timestamp, NEW.result) ON CONFLICT(node, test) DO UPDATE SET latest_timestamp = NEW.timestamp, result = NEW.result WHERE NEW.timestamp >= latest_status.latest_timestamp; END;\")
+    conn.execute(\"INSERT INTO latest_status (node, test, latest_timestamp, result) SELECT node, test, MAX(timestamp), result FROM runs GROUP BY node, test ON CONFLICT(node, test) DO UPDATE SET latest_timestamp = excluded.latest_timestamp, result = excluded.result WHERE excluded.latest_timestamp >= latest_status.latest_timestamp;\")
     conn.execute(\"INSERT INTO runs(node, test, timestamp, result) VALUES (?,?,?,?)\", (node, test, ts, res))
     conn.commit()
     print(f'Added: {node} {test} {res} {ts}')
@@ -27,7 +27,10 @@ try:
     conn.execute('PRAGMA synchronous=NORMAL;')
     conn.execute(\"CREATE TABLE IF NOT EXISTS runs (node TEXT NOT NULL, test TEXT NOT NULL, timestamp INTEGER NOT NULL, result TEXT NOT NULL CHECK (result IN ('pass','fail','incomplete')));\")
     conn.execute('CREATE INDEX IF NOT EXISTS idx_runs_node_test_ts ON runs(node, test, timestamp);')
-    conn.execute(\"CREATE VIEW IF NOT EXISTS latest_status AS SELECT r.node, r.test, r.timestamp AS latest_timestamp, r.result FROM runs r JOIN (SELECT node, test, MAX(timestamp) AS max_ts FROM runs GROUP BY node, test) x ON r.node=x.node AND r.test=x.test AND r.timestamp=x.max_ts;\")
+    conn.execute('DROP VIEW IF EXISTS latest_status;')
+    conn.execute(\"CREATE TABLE IF NOT EXISTS latest_status (node TEXT NOT NULL, test TEXT NOT NULL, latest_timestamp INTEGER NOT NULL, result TEXT NOT NULL, PRIMARY KEY (node, test));\")
+    conn.execute(\"CREATE TRIGGER IF NOT EXISTS trg_runs_latest AFTER INSERT ON runs BEGIN INSERT INTO latest_status (node, test, latest_timestamp, result) VALUES (NEW.node, NEW.test, NEW.timestamp, NEW.result) ON CONFLICT(node, test) DO UPDATE SET latest_timestamp = NEW.timestamp, result = NEW.result WHERE NEW.timestamp >= latest_status.latest_timestamp; END;\")
+    conn.execute(\"INSERT INTO latest_status (node, test, latest_timestamp, result) SELECT node, test, MAX(timestamp), result FROM runs GROUP BY node, test ON CONFLICT(node, test) DO UPDATE SET latest_timestamp = excluded.latest_timestamp, result = excluded.result WHERE excluded.latest_timestamp >= latest_status.latest_timestamp;\")
     conn.commit()
     print(f'Successfully initialized DB at {db_path}')
 except Exception as e:
@@ -0,0 +1,57 @@
+"""
+Long-lived in-pod query helper.
+
+Runs inside the pvc-access pod over a persistent `kubectl exec -i` pipe
+(see PodSidecar in utils/functions.py).  Reads one JSON request per line
+from stdin ({"db": ..., "sql": ..., "args": [...]}) and writes one JSON
+response per line ({"ok": true, "rows": [...]}).  SQLite connections are
+opened once per database path and reused across requests, so callers pay
+the kubectl exec handshake and interpreter start-up exactly once.
+"""
+
+import json
+import sqlite3
+import sys
+
+_conns = {}
+
+
+def _conn(db_path):
+    conn = _conns.get(db_path)
+    if conn is None:
+        # Read-only open: the sidecar only ever serves SELECTs, and mode=ro
+        # guarantees a stray query can never create or mutate a database.
+        # (Not immutable=1 -- validation jobs append concurrently, and
+        # immutable readers would see a frozen, possibly corrupt snapshot.)
+        # A DB that does not exist yet fails to connect; the error goes back
+        # as the normal {"ok": false} response and nothing is cached, so the
+        # next request retries mode=ro and picks up a later-created DB.
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        conn.execute("PRAGMA query_only=1;")
+        _conns[db_path] = conn
+    return conn
+
+
+def main():
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            req = json.loads(line)
+            if 'batch' in req:
+                # Several queries answered in one round-trip
+                results = [_conn(q['db']).execute(q['sql'], q.get('args') or []).fetchall()
+                           for q in req['batch']]
+                resp = {'ok': True, 'results': results}
+            else:
+                rows = _conn(req['db']).execute(req['sql'], req.get('args') or []).fetchall()
+                resp = {'ok': True, 'rows': rows}
+        except Exception as e:
+            resp = {'ok': False, 'error': str(e)}
+        sys.stdout.write(json.dumps(resp) + '\n')
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()